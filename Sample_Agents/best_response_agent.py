@@ -0,0 +1,74 @@
+from agent_class import AbstractAgent
+from best_response import best_response
+from planner import BudgetPlanner
+import numpy as np
+
+
+class Agent(AbstractAgent):
+    """
+    Predicts each opponent's next bid per field as the larger of its last bid
+    and its running average, then buys the most valuable set of fields it can
+    outbid. How much of the balance to use each round comes from a
+    BudgetPlanner fed with what every past round would have paid out.
+    """
+
+    wants_stats = True
+    wants_array_history = True
+
+    def __init__(self, name):
+        super().__init__(name)
+        # game -> [planner, rounds observed, last round played]
+        self.planners = {}
+
+    def update_planner(self, field_values, history, others, balances, current_round, total_rounds):
+        """The game's planner, fed with every round it has not seen yet."""
+        # A game's history buffer stays put for the whole game, and games
+        # played side by side (BatchEnv) each have their own
+        game = (history.__array_interface__["data"][0], tuple(field_values))
+        entry = self.planners.get(game)
+        if entry is None and current_round == 1:
+            # A new game starts: forget the ones that have finished
+            for key in [k for k, e in self.planners.items() if e[2] >= total_rounds]:
+                del self.planners[key]
+        # New game, or a restarted worker joining mid-game
+        if entry is None or len(history) < entry[1]:
+            entry = [BudgetPlanner(int(max(balances.values()))), 0, current_round]
+            self.planners[game] = entry
+        planner, observed = entry[0], entry[1]
+        for rnd in history[observed:]:
+            planner.observe_bids(field_values, rnd[others])
+        entry[1], entry[2] = len(history), current_round
+        return planner
+
+    def get_allocation(
+        self,
+        current_balance,
+        field_values,
+        num_fields,
+        history,
+        balances,
+        total_rounds,
+        current_round,
+        agent_index=None,
+        stats=None,
+    ) -> list:
+        rounds_left = (total_rounds - current_round) + 1
+        others = [i for name, i in agent_index.items() if name != self.name]
+
+        # 1. Budget: learned price curve, planned over the rounds left
+        planner = self.update_planner(
+            field_values, history, others, balances, current_round, total_rounds
+        )
+        round_budget = planner.plan(current_balance, max(rounds_left, 1))
+
+        if len(history) == 0 or stats is None:
+            return [round_budget // num_fields] * num_fields
+
+        # 2. Predict: opponents bid at least what they did, capped by what they still have
+        predicted = np.maximum(history[-1][others], stats.alloc_ewma[others])
+        left = np.array([balances[stats.agent_names[i]] for i in others])
+        predicted = np.minimum(predicted, left[:, None])
+
+        # 3. Best response within this round's budget
+        allocation, _ = best_response(field_values, predicted, round_budget, num_fields)
+        return allocation.tolist()
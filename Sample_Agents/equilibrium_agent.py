@@ -0,0 +1,52 @@
+from agent_class import AbstractAgent
+from equilibrium import round_units, solve, to_allocation
+import numpy as np
+
+# Solved strategies kept per agent; older ones are solved again (from the disk cache)
+MAX_STRATEGIES = 256
+
+
+class Agent(AbstractAgent):
+    """
+    Spends an even share of its balance every round and splits it by sampling
+    from an approximate equilibrium of the round (equilibrium.py) for its
+    field values and number of players. With too many fields to solve, it
+    splits the budget evenly instead.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        # (field values, players, units) -> (actions, probs); one agent may play
+        # several games at once (BatchEnv), so nothing is tied to the last game
+        self.strategies = {}
+
+    def strategy(self, field_values, num_agents, units):
+        key = (tuple(field_values), num_agents, units)
+        if key not in self.strategies:
+            if len(self.strategies) >= MAX_STRATEGIES:
+                self.strategies.pop(next(iter(self.strategies)))
+            self.strategies[key] = solve(field_values, units, num_agents)
+        return self.strategies[key]
+
+    def get_allocation(
+        self,
+        current_balance,
+        field_values,
+        num_fields,
+        history,
+        balances,
+        total_rounds,
+        current_round,
+    ) -> list:
+        rounds_left = (total_rounds - current_round) + 1
+        budget = current_balance if rounds_left <= 1 else current_balance // rounds_left
+
+        # 1. Strategy for these field values, sized by this round's budget
+        units = round_units(budget, num_fields)
+        if units is None:
+            return to_allocation(np.ones(num_fields), num_fields, budget).tolist()
+        actions, probs = self.strategy(field_values, len(balances), units)
+
+        # 2. Sample a split and scale it to this round's budget
+        split = actions[np.random.choice(len(probs), p=probs)]
+        return to_allocation(split, units, budget).tolist()
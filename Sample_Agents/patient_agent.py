@@ -8,6 +8,8 @@ class Agent(AbstractAgent):
     and only wins them if the cost is below the 'fair share' budget.
     """
 
+    wants_stats = True
+
     def get_allocation(
         self,
         current_balance,
@@ -17,6 +19,7 @@ class Agent(AbstractAgent):
         balances,
         total_rounds,
         current_round,
+        stats=None,
     ) -> list:
         rounds_left = (total_rounds - current_round) + 1
 
@@ -29,9 +32,12 @@ class Agent(AbstractAgent):
             # Start very lean to save for later
             return [round_budget // num_fields] * num_fields
 
-        # 2. Analyze 'Heat' (same as before)
-        all_maxes = [np.max(list(r.values()), axis=0) for r in history]
-        historical_heat = np.mean(all_maxes, axis=0)
+        # 2. Analyze 'Heat': mean of each field's highest bid per round
+        if stats is not None:
+            historical_heat = stats.mean_max
+        else:
+            all_maxes = [np.max(list(r.values()), axis=0) for r in history]
+            historical_heat = np.mean(all_maxes, axis=0)
         least_contested = np.argsort(historical_heat)
 
         # 3. Allocation
@@ -5,6 +5,8 @@ import numpy as np
 class Agent(AbstractAgent):
     """Example: Looks at what happened last round and adds 1 to each field."""
 
+    wants_stats = True
+
     def get_allocation(
         self,
         current_balance,
@@ -14,16 +16,20 @@ class Agent(AbstractAgent):
         balances,
         total_rounds,
         current_round,
+        stats=None,
     ) -> list:
         if not history:
             return [
                 int((current_balance / total_rounds) // (num_fields * 2))
             ] * num_fields
 
-        last_round = history[-1]
         # Find the max deployed by anyone last round on each field
-        all_deployments = np.array(list(last_round.values()), dtype=int)
-        max_last_round = np.max(all_deployments, axis=0)
+        if stats is not None:
+            max_last_round = stats.last_max
+        else:
+            last_round = history[-1]
+            all_deployments = np.array(list(last_round.values()), dtype=int)
+            max_last_round = np.max(all_deployments, axis=0)
 
         my_move = max_last_round + 1
         if sum(my_move) > current_balance:
@@ -29,3 +29,22 @@ class Agent(AbstractAgent):
             round_spending = min(current_balance, round_spending)
         average = round_spending // num_fields
         return [average] * num_fields
+
+    def get_allocation_batch(
+        self,
+        current_balance,
+        field_values,
+        num_fields,
+        history,
+        balances,
+        total_rounds,
+        current_round,
+        agent_index,
+    ):
+        """Same rule as get_allocation, applied to every game of a BatchEnv at once."""
+        if current_round == total_rounds:
+            round_spending = current_balance
+        else:
+            round_spending = current_balance // (total_rounds - current_round + 1)
+        average = round_spending // num_fields
+        return np.repeat(average[:, None], num_fields, axis=1)
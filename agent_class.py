@@ -3,6 +3,12 @@ from abc import ABC, abstractmethod
 
 
 class AbstractAgent(ABC):
+    # Set to True to receive a read-only FieldStats as get_allocation(..., stats=)
+    wants_stats = False
+    # Set to True to receive history as a read-only (rounds, agents, fields) int32
+    # array, plus get_allocation(..., agent_index={name: row})
+    wants_array_history = False
+
     def __init__(self, name):
         self.name = name
 
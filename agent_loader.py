@@ -0,0 +1,193 @@
+import os
+import sys
+import ast
+import time
+import py_compile
+import importlib.util
+from contextlib import contextmanager
+
+# Seconds a sandboxed agent may take to import (config: [referee] import_timeout)
+IMPORT_TIMEOUT = 30.0
+
+
+@contextmanager
+def _bytecode_prefix(cache_dir):
+    """Points bytecode reads and writes at cache_dir while an agent is compiled."""
+    if cache_dir is None:
+        yield
+        return
+    saved = sys.pycache_prefix
+    sys.pycache_prefix = os.path.abspath(cache_dir)
+    try:
+        yield
+    finally:
+        sys.pycache_prefix = saved
+
+
+def compile_agent(path, module_name, cache_dir=None):
+    """
+    Code object of an agent file. With cache_dir, the .pyc is read from and
+    written to that directory (mirroring the source path), so submissions in
+    read-only folders are compiled once rather than on every run.
+    """
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    with _bytecode_prefix(cache_dir):
+        if cache_dir is not None:
+            # Written explicitly: an opted-in cache ignores PYTHONDONTWRITEBYTECODE
+            cfile = importlib.util.cache_from_source(path)
+            if not os.path.exists(cfile) or os.path.getmtime(cfile) < os.path.getmtime(path):
+                py_compile.compile(path, cfile=cfile, doraise=True)
+        code = spec.loader.get_code(module_name)
+    return spec, code
+
+
+def defines_class(path, class_name="Agent"):
+    """
+    Whether an agent file binds class_name at top level (class, assignment or
+    import), checked from its source so that helper modules are skipped
+    without importing them.
+    """
+    with open(path, "rb") as f:
+        source = f.read()
+    try:
+        tree = ast.parse(source, path)
+    except SyntaxError:
+        # Let the import fail and be reported like any other broken agent
+        return True
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            return True
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == class_name for t in node.targets
+        ):
+            return True
+        if isinstance(node, (ast.Import, ast.ImportFrom)) and any(
+            (a.asname or a.name) == class_name for a in node.names
+        ):
+            return True
+    return False
+
+
+def import_agent(path, name, module_name=None, class_name="Agent", cache_dir=None):
+    """Imports an agent file and returns (agent instance, import seconds)."""
+    module_name = module_name or os.path.basename(path)[:-3]
+    start = time.perf_counter()
+    spec, code = compile_agent(path, module_name, cache_dir)
+    module = importlib.util.module_from_spec(spec)
+    exec(code, module.__dict__)
+    agent = getattr(module, class_name)(name=name)
+    return agent, time.perf_counter() - start
+
+
+class LazyAgent:
+    """
+    Stand-in for an agent that imports its module on first use, so only
+    the agents actually scheduled for a game pay their import cost.
+    """
+
+    def __init__(self, name, path, module_name=None, class_name="Agent", cache_dir=None):
+        self.name = name
+        self.path = path
+        self.module_name = module_name
+        self.class_name = class_name
+        self.cache_dir = cache_dir
+        self.import_time = None
+        self._agent = None
+        self._error = None
+
+    def ensure_imported(self, timeout=None):
+        """
+        The imported agent. A failed import is remembered and re-raised
+        rather than retried on every move. timeout is accepted for
+        RemoteAgent compatibility; an in-process import cannot be interrupted.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._agent is None:
+            try:
+                self._agent, self.import_time = import_agent(
+                    self.path, self.name, self.module_name, self.class_name, self.cache_dir
+                )
+            except Exception as e:
+                self._error = e
+                raise
+        return self._agent
+
+    def __getattr__(self, attr):
+        # Only reached for attributes LazyAgent does not define itself
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        try:
+            agent = self.ensure_imported()
+        except Exception as e:
+            # A broken submission has no opt-ins; its moves fail and play zeros
+            raise AttributeError(f"{self.name} failed to import: {attr}") from e
+        return getattr(agent, attr)
+
+    def get_allocation(self, *args, **kwargs):
+        return self.ensure_imported().get_allocation(*args, **kwargs)
+
+    def __repr__(self):
+        state = "imported" if self._agent is not None else "failed" if self._error else "not imported"
+        return f"LazyAgent({self.name!r}, {self.path!r}, {state})"
+
+
+def ensure_imported(agents, timeout=IMPORT_TIMEOUT):
+    """
+    Imports every lazily loaded or sandboxed agent up front, outside any move
+    timer. A sandboxed agent not ready within timeout seconds is shut down
+    and forfeits its moves, so a hanging import cannot stall the tournament.
+    """
+    for agent in agents:
+        if hasattr(agent, "ensure_imported"):
+            try:
+                if not agent.ensure_imported(timeout):
+                    print(f"Agent {agent.name} did not import within {timeout}s. Forfeiting.")
+                    agent.forfeit()
+            except Exception as e:
+                # The agent's moves will fail the same way and fall back to zeros
+                print(f"Agent {agent.name} failed to import: {e}")
+
+
+def precompile(paths, cache_dir):
+    """Compiles agent files into cache_dir without importing them."""
+    for path in paths:
+        compile_agent(path, os.path.basename(path)[:-3], cache_dir)
+
+
+def print_import_times(import_times):
+    """{name: seconds} -> table, slowest first."""
+    header = f"{'Agent':<20} | {'import ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, seconds in sorted(import_times.items(), key=lambda x: -x[1]):
+        print(f"{name:<20} | {1e3 * seconds:>10.1f}")
+    print(f"{'total':<20} | {1e3 * sum(import_times.values()):>10.1f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-compile agents and report import times.")
+    parser.add_argument("folder", nargs="?", default="Sample_Agents")
+    parser.add_argument("--cache-dir", default=None, help="bytecode cache directory")
+    parser.add_argument(
+        "--precompile", action="store_true", help="only compile, do not import"
+    )
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    paths = sorted(
+        os.path.join(args.folder, f)
+        for f in os.listdir(args.folder)
+        if f.endswith(".py") and f != "__init__.py"
+    )
+    if args.precompile:
+        precompile(paths, args.cache_dir)
+        print(f"Compiled {len(paths)} agents into {args.cache_dir or '__pycache__'}")
+    else:
+        times = {}
+        for path in paths:
+            name = os.path.basename(path)[:-3]
+            _, times[name] = import_agent(path, name, cache_dir=args.cache_dir)
+        print_import_times(times)
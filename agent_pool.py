@@ -0,0 +1,307 @@
+import os
+import sys
+import random
+import struct
+import multiprocessing
+import numpy as np
+from agent_loader import import_agent
+from env import resolve_fields
+from history import HISTORY_DTYPE, HistoryStore, history_args
+from referee import MoveTimeout
+from stats import FieldStats, stats_kwargs
+
+# Agents run in freshly spawned interpreters, never forked from the referee
+_ctx = multiprocessing.get_context("spawn")
+
+# Wire protocol. Every message starts with one type byte.
+# NEW_GAME: num_agents, num_fields, total_rounds | field values (int64) | names ("\n"-joined utf-8)
+# MOVE:     current_round, new_rounds | balances (int64) | new history rows (int32)
+# SEED:     seed for the worker's `random` and `np.random` streams (uint32)
+# Replies:  status byte | container kind, dtype char | allocation, or error message (utf-8)
+# READY:    sent once after the agent is imported | import seconds (float64)
+NEW_GAME, MOVE, STOP, SEED = 1, 2, 3, 4
+OK, AGENT_ERROR, READY = 0, 1, 2
+# Container the agent returned, so the referee validates what the agent really sent
+LIST, ARRAY, OTHER = 0, 1, 2
+_TYPE = struct.Struct("<B")
+_GAME = struct.Struct("<iii")
+_MOVE = struct.Struct("<ii")
+_SEED = struct.Struct("<I")
+_REPLY = struct.Struct("<Bc")
+_READY = struct.Struct("<d")
+
+
+def _encode_move(move):
+    kind = LIST if isinstance(move, list) else ARRAY if isinstance(move, np.ndarray) else OTHER
+    arr = np.asarray(move)
+    # tobytes() would flatten anything else into a valid-looking row
+    if arr.ndim != 1:
+        raise TypeError(f"allocation must be one-dimensional, got shape {arr.shape}")
+    if arr.dtype.kind not in "biuf":
+        raise TypeError(f"allocation must be numeric, got {arr.dtype}")
+    return _TYPE.pack(OK) + _REPLY.pack(kind, arr.dtype.char.encode()) + arr.tobytes()
+
+
+def _decode_move(reply):
+    kind, char = _REPLY.unpack_from(reply, _TYPE.size)
+    arr = np.frombuffer(reply, np.dtype(char.decode()), offset=_TYPE.size + _REPLY.size)
+    if kind == LIST:
+        return arr.tolist()
+    if kind == ARRAY:
+        return arr
+    return tuple(arr.tolist())
+
+
+class AgentCrashed(Exception):
+    """Raised when an agent's worker process dies or its agent raises."""
+
+
+def _serve(conn, path, name, memory_limit_mb, cache_dir=None):
+    """Worker process: imports the agent once and answers MOVE requests."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if memory_limit_mb is not None:
+        import resource
+
+        limit = memory_limit_mb * 2**20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    try:
+        agent, import_time = import_agent(path, name, module_name=name, cache_dir=cache_dir)
+    except Exception as e:
+        conn.send_bytes(_TYPE.pack(AGENT_ERROR) + repr(e).encode())
+        return
+    conn.send_bytes(_TYPE.pack(READY) + _READY.pack(import_time))
+
+    while True:
+        msg = conn.recv_bytes()
+        kind = msg[0]
+        body = memoryview(msg)[_TYPE.size :]
+
+        if kind == NEW_GAME:
+            num_agents, num_fields, total_rounds = _GAME.unpack_from(body)
+            body = body[_GAME.size :]
+            field_values = np.frombuffer(body[: 8 * num_fields], np.int64).tolist()
+            names = bytes(body[8 * num_fields :]).decode().split("\n")
+            store = HistoryStore(names, num_fields, total_rounds)
+            stats = FieldStats(names, num_fields) if getattr(agent, "wants_stats", False) else None
+
+        elif kind == MOVE:
+            current_round, new_rounds = _MOVE.unpack_from(body)
+            body = body[_MOVE.size :]
+            balances = np.frombuffer(body[: 8 * num_agents], np.int64).tolist()
+            rows = np.frombuffer(body[8 * num_agents :], HISTORY_DTYPE)
+            rows = rows.reshape(new_rounds, num_agents, num_fields)
+            for row in rows:
+                store.append(row)
+            if stats is not None and new_rounds:
+                winners, _ = resolve_fields(rows, np.asarray(field_values, np.int64))
+                for row, round_winners in zip(rows, winners):
+                    stats.update(row, round_winners)
+            balances = dict(zip(names, balances))
+            history, kwargs = history_args(agent, store.view())
+            try:
+                move = agent.get_allocation(
+                    balances[name],
+                    field_values,
+                    num_fields,
+                    history,
+                    balances,
+                    total_rounds,
+                    current_round,
+                    **kwargs,
+                    **stats_kwargs(agent, stats),
+                )
+                reply = _encode_move(move)
+            except Exception as e:
+                reply = _TYPE.pack(AGENT_ERROR) + repr(e).encode()
+            conn.send_bytes(reply)
+
+        elif kind == SEED:
+            (seed,) = _SEED.unpack_from(body)
+            random.seed(seed)
+            np.random.seed(seed)
+
+        elif kind == STOP:
+            return
+
+
+class RemoteAgent:
+    """
+    Drop-in stand-in for an agent that runs it in its own long-lived process.
+    The agent module is imported once per process; each move only ships the
+    balances and the history rounds the worker has not seen yet.
+    A worker that hangs past `timeout` or dies is killed and restarted (with
+    the game history replayed to it) at most `max_restarts` times.
+    """
+
+    def __init__(
+        self,
+        name,
+        path,
+        timeout=None,
+        memory_limit_mb=None,
+        max_restarts=3,
+        cache_dir=None,
+    ):
+        self.name = name
+        self.path = path
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_restarts = max_restarts
+        self.cache_dir = cache_dir
+        self.restarts = 0
+        self.import_time = None
+        self._seed = None
+        self._start()
+
+    def _start(self):
+        self._conn, child = _ctx.Pipe()
+        self._proc = _ctx.Process(
+            target=_serve,
+            args=(child, self.path, self.name, self.memory_limit_mb, self.cache_dir),
+            daemon=True,
+        )
+        self._proc.start()
+        child.close()
+        # Identity of the game the worker holds and how many rounds it has seen
+        self._game = None
+        self._store = None
+        self._synced = 0
+        self._ready = False
+        if self._seed is not None:
+            self._conn.send_bytes(_TYPE.pack(SEED) + _SEED.pack(self._seed))
+
+    def ensure_imported(self, timeout=None):
+        """
+        Waits until the worker has imported its agent, so import time is not
+        charged to the first move. Returns False if it is not ready in time.
+        """
+        if self._ready:
+            return True
+        if not self._proc.is_alive() and self.restarts >= self.max_restarts:
+            raise AgentCrashed(f"{self.name} worker is down")
+        try:
+            if not self._conn.poll(timeout):
+                return False
+            reply = self._conn.recv_bytes()
+        except (EOFError, OSError) as e:
+            raise AgentCrashed(f"{self.name} worker died while importing: {e}") from None
+        if reply[0] == AGENT_ERROR:
+            raise AgentCrashed(reply[1:].decode())
+        (self.import_time,) = _READY.unpack_from(reply, _TYPE.size)
+        self._ready = True
+        return True
+
+    def forfeit(self):
+        """Kills the worker for good: every later move raises AgentCrashed."""
+        self.restarts = self.max_restarts
+        self._proc.kill()
+        self._proc.join()
+
+    def reseed(self, seed):
+        """Seeds the worker's global RNGs; a restarted worker is reseeded too."""
+        self._seed = seed
+        if self._proc.is_alive():
+            self._conn.send_bytes(_TYPE.pack(SEED) + _SEED.pack(seed))
+
+    def _restart(self):
+        self._proc.kill()
+        self._proc.join()
+        self._conn.close()
+        if self.restarts < self.max_restarts:
+            self.restarts += 1
+            self._start()
+
+    def _sync_game(self, field_values, num_fields, history, balances, total_rounds):
+        """Returns the history rows the worker is missing, starting a new game if needed."""
+        names = list(balances)
+        game = (tuple(field_values), tuple(names), num_fields, total_rounds)
+        store = getattr(history, "store", None)
+        # Only the engine's own history views are known to be append-only
+        same_history = store is not None and store is self._store
+        if game != self._game or not same_history or len(history) < self._synced:
+            msg = _TYPE.pack(NEW_GAME) + _GAME.pack(len(names), num_fields, total_rounds)
+            msg += np.asarray(field_values, np.int64).tobytes()
+            msg += "\n".join(names).encode()
+            self._conn.send_bytes(msg)
+            self._game, self._store, self._synced = game, store, 0
+
+        if hasattr(history, "array"):
+            rows = history.array[self._synced :]
+        else:
+            rows = [[r[n] for n in names] for r in history[self._synced :]]
+        self._synced = len(history)
+        return np.asarray(rows, HISTORY_DTYPE).reshape(-1, len(names), num_fields)
+
+    def get_allocation(
+        self,
+        current_balance,
+        field_values,
+        num_fields,
+        history,
+        balances,
+        total_rounds,
+        current_round,
+    ) -> list:
+        if not self._proc.is_alive():
+            if self.restarts >= self.max_restarts:
+                raise AgentCrashed(f"{self.name} worker is down")
+            self._restart()
+
+        try:
+            # A restarted worker gets one move timeout to import its agent
+            if not self.ensure_imported(self.timeout):
+                self._restart()
+                raise MoveTimeout(f"{self.name} did not import within {self.timeout}s")
+            rows = self._sync_game(
+                field_values, num_fields, history, balances, total_rounds
+            )
+            msg = _TYPE.pack(MOVE) + _MOVE.pack(current_round, len(rows))
+            msg += np.fromiter(balances.values(), np.int64, len(balances)).tobytes()
+            msg += rows.tobytes()
+            self._conn.send_bytes(msg)
+
+            if not self._conn.poll(self.timeout):
+                self._restart()
+                raise MoveTimeout(f"{self.name} timed out after {self.timeout}s")
+            reply = self._conn.recv_bytes()
+        except (EOFError, OSError) as e:
+            self._restart()
+            raise AgentCrashed(f"{self.name} worker died: {e}") from None
+
+        if reply[0] == AGENT_ERROR:
+            raise AgentCrashed(reply[1:].decode())
+        return _decode_move(reply)
+
+    def close(self):
+        if self._conn.closed:
+            return
+        if self._proc.is_alive():
+            try:
+                self._conn.send_bytes(_TYPE.pack(STOP))
+            except OSError:
+                pass
+            self._proc.join(timeout=1)
+            if self._proc.is_alive():
+                self._proc.kill()
+        self._conn.close()
+
+
+class AgentPool:
+    """Starts one RemoteAgent per (name, path) and shuts them all down on exit."""
+
+    def __init__(self, agent_files, timeout=None, memory_limit_mb=None, cache_dir=None):
+        self.agents = [
+            RemoteAgent(name, path, timeout, memory_limit_mb, cache_dir=cache_dir)
+            for name, path in agent_files
+        ]
+
+    def __enter__(self):
+        return self.agents
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for agent in self.agents:
+            agent.close()
@@ -0,0 +1,180 @@
+import numpy as np
+from env import resolve_fields
+from history import HISTORY_DTYPE, HistoryStore, history_args
+from stats import FieldStats, stats_kwargs
+from validation import validate_allocations
+
+
+def draw_field_values(num_games, num_fields, rng=None):
+    """Draws field values for every game the same way start_tournament does."""
+    rng = np.random.default_rng() if rng is None else rng
+    return rng.integers(2, 10, size=(num_games, num_fields))
+
+
+class BatchEnv:
+    """
+    Plays G independent games with the same line-up in lockstep.
+    State is held as arrays: balances and scores (G, agents),
+    field values (G, fields) and history (G, rounds, agents, fields).
+
+    Agents may define a vectorized hook
+        get_allocation_batch(current_balance, field_values, num_fields, history,
+                             balances, total_rounds, current_round, agent_index)
+    which receives the batched arrays (current_balance: (G,), balances: (G, agents),
+    history: read-only (G, rounds_so_far, agents, fields)) plus a {name: column}
+    mapping, and returns a (G, fields) allocation matrix.
+    Agents without it are called once per game through get_allocation.
+    """
+
+    def __init__(
+        self,
+        agent_names,
+        field_values,
+        num_fields=5,
+        total_rounds=5,
+        starting_soldiers=100,
+    ):
+        self.agent_names = list(agent_names)
+        self.agent_index = {name: i for i, name in enumerate(self.agent_names)}
+        self.field_values = np.asarray(field_values, dtype=np.int64)
+        self.num_games = len(self.field_values)
+        self.num_fields = num_fields
+        self.total_rounds = total_rounds
+        self.starting_soldiers = starting_soldiers
+        self.reset()
+
+    def reset(self):
+        """Resets every game to round 0."""
+        shape = (self.num_games, len(self.agent_names))
+        self.current_round = 0
+        self.balances = np.full(shape, self.starting_soldiers, dtype=np.int64)
+        self.scores = np.zeros(shape, dtype=np.int64)
+        self.history = np.zeros(
+            shape[:1] + (self.total_rounds,) + shape[1:] + (self.num_fields,),
+            dtype=HISTORY_DTYPE,
+        )
+        # Per-game list-of-dicts views, only built if a plain agent needs them
+        self._game_stores = None
+        self.stats = FieldStats(self.agent_names, self.num_fields, (self.num_games,))
+        return self.get_state()
+
+    def get_state(self):
+        """Returns read-only views of the batched state."""
+        state = {
+            "balances": self.balances.view(),
+            "history": self.history[:, : self.current_round],
+            "scores": self.scores.view(),
+        }
+        for arr in state.values():
+            arr.flags.writeable = False
+        state["current_round"] = self.current_round
+        return state
+
+    def step(self, allocations):
+        """
+        Processes one round of every game.
+        allocations: (G, agents, fields) array of validated moves.
+        Returns the new state and the (G, fields) winner index per field (-1 for ties).
+        """
+        allocations = np.asarray(allocations, dtype=np.int64)
+        winners, gains = resolve_fields(allocations, self.field_values)
+        self.balances -= allocations.sum(axis=-1)
+        self.scores += gains
+        self.history[:, self.current_round] = allocations
+        self.stats.update(allocations, winners)
+        self.current_round += 1
+        return self.get_state(), winners
+
+    def game_history(self, game):
+        """List-of-dicts history view of a single game, as get_allocation expects."""
+        if self._game_stores is None:
+            self._game_stores = [
+                HistoryStore(self.agent_names, self.num_fields, self.total_rounds, data=h)
+                for h in self.history
+            ]
+        return self._game_stores[game].view(self.current_round)
+
+    def collect_allocations(self, agents):
+        """Asks every agent for its move in every game and returns the (G, agents, fields) matrix."""
+        moves = np.zeros(
+            (self.num_games, len(self.agent_names), self.num_fields), dtype=np.int64
+        )
+        for agent in agents:
+            col = self.agent_index[agent.name]
+            batch_hook = getattr(agent, "get_allocation_batch", None)
+            budget = self.balances[:, col]
+            try:
+                if batch_hook is not None:
+                    agent_moves = self.validate(self._batch_move(batch_hook, col), budget)
+                else:
+                    # Raw per-game moves get exactly the checks Env applies
+                    agent_moves, _ = validate_allocations(
+                        self._per_game_moves(agent), self.num_fields, budget
+                    )
+            except Exception as e:
+                print(f"Agent {agent.name} crashed: {e}")
+                continue
+            moves[:, col] = agent_moves
+        return moves
+
+    def _batch_move(self, batch_hook, col):
+        state = self.get_state()
+        return batch_hook(
+            state["balances"][:, col],
+            self.field_values,
+            self.num_fields,
+            state["history"],
+            state["balances"],
+            self.total_rounds,
+            self.current_round + 1,
+            self.agent_index,
+        )
+
+    def _per_game_moves(self, agent):
+        """The agent's raw get_allocation result for every game, None where it crashed."""
+        wants_stats = getattr(agent, "wants_stats", False)
+        proposals = []
+        for g in range(self.num_games):
+            balances = dict(zip(self.agent_names, self.balances[g].tolist()))
+            history, kwargs = history_args(agent, self.game_history(g))
+            try:
+                move = agent.get_allocation(
+                    balances[agent.name],
+                    self.field_values[g].tolist(),
+                    self.num_fields,
+                    history,
+                    balances,
+                    self.total_rounds,
+                    self.current_round + 1,
+                    **kwargs,
+                    **stats_kwargs(agent, self.stats.game(g) if wants_stats else None),
+                )
+            except Exception:
+                # A crash forfeits this game's round only
+                move = None
+            proposals.append(move)
+        return proposals
+
+    def validate(self, proposal, budget):
+        """
+        Vectorized counterpart of validate_allocation: rows that are negative,
+        non-integer or over budget are replaced by zeros.
+        """
+        proposal = np.asarray(proposal, dtype=np.float64)
+        if proposal.shape != (self.num_games, self.num_fields):
+            return np.zeros((self.num_games, self.num_fields), dtype=np.int64)
+        moves, _ = validate_allocations(proposal, self.num_fields, budget)
+        return moves
+
+    def play(self, agents):
+        """Plays every remaining round of all games and returns the final state."""
+        state = self.get_state()
+        while self.current_round < self.total_rounds:
+            state, _ = self.step(self.collect_allocations(agents))
+        return state
+
+    def game_winners(self):
+        """Index of the winning agent of every game, -1 where the top score is tied."""
+        top = self.scores.max(axis=1, keepdims=True)
+        at_top = self.scores == top
+        return np.where(at_top.sum(axis=1) == 1, at_top.argmax(axis=1), -1)
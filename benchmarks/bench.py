@@ -0,0 +1,235 @@
+"""
+Benchmarks for the engine, the referee and the sample agents.
+
+Run from the repository root:
+    python benchmarks/bench.py                       # full sweep, print table
+    python benchmarks/bench.py --quick --save benchmarks/baseline.json
+    python benchmarks/bench.py --compare benchmarks/baseline.json --threshold 0.25
+
+Each case is measured at one size at a time: agents are swept with 5 fields and
+10 rounds of history, fields with 5 agents, and rounds with 5 agents and 5 fields.
+Every measurement runs in a fresh process, so peak RSS belongs to that case alone.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import resource
+import tracemalloc
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from env import Env  # noqa: E402
+from utils import load_agent  # noqa: E402
+from stats import stats_kwargs  # noqa: E402
+from history import history_args  # noqa: E402
+from validation import validate_allocations  # noqa: E402
+from run_tournament import run_round_logic  # noqa: E402
+
+BASE = {"agents": 5, "fields": 5, "rounds": 10}
+SWEEPS = {
+    "agents": [2, 10, 100, 1000],
+    "fields": [5, 50, 200, 1000],
+    "rounds": [5, 100, 1000, 10000],
+}
+QUICK_SWEEPS = {"agents": [2, 100], "fields": [5, 200], "rounds": [5, 1000]}
+# Metrics checked by --compare, and changes too small to count as a regression
+METRICS = {"ns_per_op": 0, "alloc_bytes": 1024, "peak_rss_kb": 1024}
+
+# Keep the history that repeated env.step calls append below ~80 MB
+MAX_STEP_ELEMENTS = 2 * 10**7
+MAX_STEP_OPS = 10**4
+
+
+def max_step_ops(agents, fields):
+    return min(MAX_STEP_OPS, MAX_STEP_ELEMENTS // (agents * fields))
+
+
+def make_env(agent_names, fields, rounds, extra_rounds=1, seed=0):
+    """Env with `rounds` rounds of random history already played."""
+    rng = np.random.default_rng(seed)
+    env = Env(
+        agent_names,
+        rng.integers(2, 10, size=fields).tolist(),
+        num_fields=fields,
+        total_rounds=rounds + extra_rounds,
+        starting_soldiers=10**9,
+    )
+    for alloc_matrix in rng.integers(0, 20, size=(rounds, len(agent_names), fields)):
+        env.step_matrix(alloc_matrix)
+    return env
+
+
+def filler_agents(n, cls):
+    return [cls(name=f"a{i}") for i in range(n)]
+
+
+def case_env_step(agents, fields, rounds):
+    max_ops = max_step_ops(agents, fields)
+    env = make_env([f"a{i}" for i in range(agents)], fields, rounds, max_ops + 2)
+    moves = {n: [1] * fields for n in env.agent_names}
+    return lambda: env.step(moves), max_ops
+
+
+def case_env_get_state(agents, fields, rounds):
+    env = make_env([f"a{i}" for i in range(agents)], fields, rounds)
+    return env.get_state, None
+
+
+def case_run_round_logic(agents, fields, rounds):
+    uniform = load_agent(os.path.join("Sample_Agents", "uniform_agent.py"))
+    players = filler_agents(agents, type(uniform))
+    max_ops = max_step_ops(agents, fields)
+    env = make_env([a.name for a in players], fields, rounds, max_ops + 2)
+    return lambda: run_round_logic(env, players, verbose=False), max_ops
+
+
+def case_validate_allocations(agents, fields, rounds):
+    # One round: a list move per agent, as play_round collects them
+    moves = [[1] * fields for _ in range(agents)]
+    budgets = [10**9] * agents
+    return lambda: validate_allocations(moves, fields, budgets), None
+
+
+def agent_case(path):
+    def case(agents, fields, rounds):
+        agent = load_agent(path)
+        names = [agent.name] + [f"a{i}" for i in range(1, agents)]
+        env = make_env(names, fields, rounds)
+        state = env.get_state()
+        history, kwargs = history_args(agent, state["history"])
+        args = (
+            1000,
+            env.field_values,
+            fields,
+            history,
+            state["balances"],
+            rounds + 1,
+            rounds + 1,
+        )
+        kwargs.update(stats_kwargs(agent, env.stats))
+        return lambda: agent.get_allocation(*args, **kwargs), None
+
+    return case
+
+
+def all_cases():
+    cases = {
+        "env.step": case_env_step,
+        "env.get_state": case_env_get_state,
+        "run_round_logic": case_run_round_logic,
+        "validate_allocations": case_validate_allocations,
+    }
+    for path in sorted(glob.glob(os.path.join("Sample_Agents", "*.py"))):
+        name = os.path.basename(path)[:-3]
+        cases[f"agent.{name}"] = agent_case(path)
+    return cases
+
+
+def measure(op, max_ops=None, target_time=0.2):
+    """Returns (ns per op, bytes allocated by one op, peak RSS in KB)."""
+    max_ops = 10**6 if max_ops is None else max(3, max_ops)
+    op()  # warm-up
+    ops, start = 0, time.perf_counter_ns()
+    while ops < max_ops:
+        op()
+        ops += 1
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= target_time * 1e9:
+            break
+    ns_per_op = elapsed / ops
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    op()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return ns_per_op, peak - before, rss_kb
+
+
+def measure_case(case_name, params, target_time):
+    op, max_ops = all_cases()[case_name](**params)
+    return measure(op, max_ops, target_time)
+
+
+def run(sweeps, only=None, target_time=0.2):
+    results = {}
+    # ru_maxrss is a lifetime peak: one spawned process per measurement
+    pool = ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("spawn"), max_tasks_per_child=1
+    )
+    with pool:
+        for case_name in all_cases():
+            if only and not any(pattern in case_name for pattern in only):
+                continue
+            for dim, sizes in sweeps.items():
+                for size in sizes:
+                    params = dict(BASE, **{dim: size})
+                    key = f"{case_name}[agents={params['agents']},fields={params['fields']},rounds={params['rounds']}]"
+                    if key in results:
+                        continue
+                    ns, alloc, rss = pool.submit(measure_case, case_name, params, target_time).result()
+                    results[key] = {"ns_per_op": ns, "alloc_bytes": alloc, "peak_rss_kb": rss}
+                    print(f"{key:<70} {ns:>14,.0f} ns/op {alloc:>12,} B {rss:>10,} KB")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns (case, metric, ratio) for every metric in METRICS that grew by
+    more than threshold over baseline, ignoring changes below its slack.
+    """
+    regressions = []
+    for key, res in results.items():
+        if key not in baseline:
+            continue
+        for metric, slack in METRICS.items():
+            new, old = res[metric], baseline[key][metric]
+            if new - old > max(threshold * old, slack):
+                ratio = new / old if old > 0 else float("inf")
+                regressions.append((key, metric, ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark engine, referee and agents.")
+    parser.add_argument("--quick", action="store_true", help="smaller sweep")
+    parser.add_argument("--only", nargs="*", help="only cases whose name contains one of these")
+    parser.add_argument("--time", type=float, default=0.2, help="seconds per measurement")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="JSON baseline to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed growth of time, allocations or RSS before --compare fails (0.25 = 25%%)",
+    )
+    args = parser.parse_args()
+
+    results = run(QUICK_SWEEPS if args.quick else SWEEPS, args.only, args.time)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for key, metric, ratio in regressions:
+            print(f"REGRESSION {key} {metric}: {ratio:.2f}x baseline")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
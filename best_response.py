@@ -0,0 +1,156 @@
+import numpy as np
+
+
+def field_costs(opponent_bids, num_fields, margin=1):
+    """
+    Soldiers needed to win each field outright: highest opponent bid + margin.
+    opponent_bids: (opponents, num_fields) bids, or the per-field highest bid.
+    Predicted (fractional) bids are beaten by floor(bid) + margin.
+    """
+    bids = np.asarray(opponent_bids, dtype=np.float64)
+    if bids.ndim == 2:
+        bids = bids.max(axis=0) if len(bids) else np.zeros(num_fields)
+    return np.floor(bids).astype(np.int64) + max(margin, 1)
+
+
+def _candidates(values, costs, budget):
+    """
+    Fields worth considering, cheapest first. Worthless and unaffordable
+    fields are dropped, and of the fields sharing a cost w only the budget // w
+    most valuable can ever be bought together, so the rest are dropped too.
+    """
+    idx = np.flatnonzero((values > 0) & (costs <= budget))
+    order = np.lexsort((-values[idx], costs[idx]))
+    idx, cost = idx[order], costs[idx[order]]
+    # Rank of each field among the fields with the same cost
+    starts = np.flatnonzero(np.r_[True, cost[1:] != cost[:-1]])
+    rank = np.arange(len(idx)) - np.repeat(starts, np.diff(np.r_[starts, len(idx)]))
+    return idx[rank < budget // np.maximum(cost, 1)]
+
+
+def _capacity_table(values, costs, budget, keep_choices=True):
+    """
+    0/1 knapsack over capacity. dp[c] is the most value winnable with at most
+    c soldiers. Items come cheapest first, so capacities above the running
+    cost total are never touched.
+    Returns dp, the per-item take table (None unless keep_choices) and the
+    capacity each item's row is valid up to.
+    """
+    dp = np.zeros(budget + 1, dtype=np.int64)
+    take = np.zeros((len(values), budget + 1), dtype=bool) if keep_choices else None
+    reaches = []
+    reach = 0
+    for i, (v, w) in enumerate(zip(values.tolist(), costs.tolist())):
+        new_reach = min(budget, reach + w)
+        # Capacities past the old reach can do no better than the old reach
+        dp[reach + 1 : new_reach + 1] = dp[reach]
+        cand = dp[: new_reach + 1 - w] + v
+        better = cand > dp[w : new_reach + 1]
+        if keep_choices:
+            take[i, w : new_reach + 1] = better
+        dp[w : new_reach + 1] = np.where(better, cand, dp[w : new_reach + 1])
+        reach = new_reach
+        reaches.append(reach)
+    dp[reach + 1 :] = dp[reach]
+    return dp, take, reaches
+
+
+def _max_value_dp(values, costs, budget):
+    """Chosen items of the capacity knapsack, using the least capacity that reaches the optimum."""
+    dp, take, reaches = _capacity_table(values, costs, budget)
+
+    # Cheapest capacity that reaches the best value, then walk back
+    cap = int(np.argmax(dp == dp[-1]))
+    chosen = []
+    for i in range(len(values) - 1, -1, -1):
+        # Beyond item i's reach the table holds its value at the reach
+        cap = min(cap, reaches[i])
+        if take[i, cap]:
+            chosen.append(i)
+            cap -= int(costs[i])
+    return chosen
+
+
+def _min_cost_dp(values, costs, budget):
+    """
+    Same knapsack over value instead of capacity. dp[v] is the fewest
+    soldiers that win exactly v points. Used when the total field value is
+    smaller than the budget.
+    """
+    total = int(values.sum())
+    inf = np.iinfo(np.int64).max // 2
+    dp = np.full(total + 1, inf, dtype=np.int64)
+    dp[0] = 0
+    take = np.zeros((len(values), total + 1), dtype=bool)
+    reach = 0
+    for i, (v, w) in enumerate(zip(values.tolist(), costs.tolist())):
+        reach += v
+        cand = dp[: reach + 1 - v] + w
+        better = cand < dp[v : reach + 1]
+        take[i, v : reach + 1] = better
+        dp[v : reach + 1] = np.where(better, cand, dp[v : reach + 1])
+
+    best = int(np.flatnonzero(dp <= budget)[-1])
+    chosen = []
+    for i in range(len(values) - 1, -1, -1):
+        if take[i, best]:
+            chosen.append(i)
+            best -= int(values[i])
+    return chosen
+
+
+def best_response(field_values, opponent_bids, budget, num_fields=None, margin=1):
+    """
+    Cheapest allocation that wins the most field value against known or
+    predicted opponent bids for one round.
+    field_values: (num_fields,) as passed to get_allocation
+    opponent_bids: (opponents, num_fields) bids, or the highest bid per field
+    budget: soldiers available for this round
+
+    Returns (allocation, value won): allocation is an int64 array with
+    highest bid + margin on every field taken and 0 elsewhere.
+    Runs in O(fields x min(budget, total value)).
+    """
+    values = np.asarray(field_values, dtype=np.int64)
+    num_fields = len(values) if num_fields is None else num_fields
+    costs = field_costs(opponent_bids, num_fields, margin)
+    budget = int(budget)
+    allocation = np.zeros(num_fields, dtype=np.int64)
+
+    # 1. Drop fields that can never be part of the answer
+    idx = _candidates(values, costs, budget)
+    if len(idx) == 0:
+        return allocation, 0
+
+    # 2. Everything affordable at once needs no search
+    if costs[idx].sum() <= budget:
+        allocation[idx] = costs[idx]
+        return allocation, int(values[idx].sum())
+
+    # 3. Knapsack on the smaller of the budget and the total value
+    if values[idx].sum() < budget:
+        chosen = _min_cost_dp(values[idx], costs[idx], budget)
+    else:
+        chosen = _max_value_dp(values[idx], costs[idx], budget)
+    won = idx[chosen]
+    allocation[won] = costs[won]
+    return allocation, int(values[won].sum())
+
+
+def value_curve(field_values, opponent_bids, budget, num_fields=None, margin=1, unit=1):
+    """
+    Most field value winnable against opponent_bids with 0..budget soldiers,
+    as an int64 array of length budget + 1. This is the price curve of one
+    round: how much a best response earns per soldier spent.
+    With unit > 1, budget and the returned curve count blocks of unit soldiers
+    and field costs are rounded up to whole blocks.
+    """
+    values = np.asarray(field_values, dtype=np.int64)
+    num_fields = len(values) if num_fields is None else num_fields
+    costs = -(-field_costs(opponent_bids, num_fields, margin) // unit)
+    budget = int(budget)
+    idx = _candidates(values, costs, budget)
+    if len(idx) == 0:
+        return np.zeros(budget + 1, dtype=np.int64)
+    dp, _, _ = _capacity_table(values[idx], costs[idx], budget, keep_choices=False)
+    return dp
@@ -1,5 +1,39 @@
+from types import MappingProxyType
+
 import numpy as np
-import copy
+from history import HistoryStore, MemmapHistoryStore, read_history_meta
+from stats import FieldStats
+
+
+def resolve_fields(alloc_matrix, field_values):
+    """
+    Resolves every field of a round at once.
+    alloc_matrix: (..., num_agents, num_fields), field_values: (..., num_fields)
+    Returns the winner index per field (-1 for a tie or an empty field)
+    and the points gained by each agent.
+    """
+    max_val = alloc_matrix.max(axis=-2, keepdims=True)
+    at_max = alloc_matrix == max_val
+    # A field is won only by a unique, non-zero maximum
+    unique = (at_max.sum(axis=-2) == 1) & (max_val[..., 0, :] > 0)
+    winners = np.where(unique, at_max.argmax(axis=-2), -1)
+    won = at_max & unique[..., None, :]
+    gains = (won * field_values[..., None, :]).sum(axis=-1)
+    return winners, gains
+
+
+class EnvState:
+    """
+    Mutable core of one game: integer agent ids index contiguous int64
+    arrays, so a round is resolved without touching any name-keyed dict.
+    """
+
+    __slots__ = ("current_round", "balances", "scores")
+
+    def __init__(self, num_agents, starting_soldiers):
+        self.current_round = 0
+        self.balances = np.full(num_agents, starting_soldiers, dtype=np.int64)
+        self.scores = np.zeros(num_agents, dtype=np.int64)
 
 
 class Env:
@@ -10,29 +44,123 @@ class Env:
         num_fields=5,
         total_rounds=5,
         starting_soldiers=100,
+        history_path=None,
+        resume=False,
     ):
+        """
+        history_path: record the history into this memory-mapped .npy file
+        (history.MemmapHistoryStore) instead of RAM. With resume, rounds
+        already in that file are kept and the game continues after them.
+        """
         self.agent_names = agent_names
         self.field_values = field_values
         self.num_fields = num_fields
         self.total_rounds = total_rounds
         self.starting_soldiers = starting_soldiers
-        self.reset()
+        self.history_path = history_path
+        self.reset(resume)
 
-    def reset(self):
+    @classmethod
+    def resume(cls, history_path):
+        """Rebuilds an Env from a history file, as of its last recorded round."""
+        meta = read_history_meta(history_path)
+        settings = meta["meta"]
+        return cls(
+            meta["agent_names"],
+            settings["field_values"],
+            num_fields=meta["num_fields"],
+            total_rounds=settings["total_rounds"],
+            starting_soldiers=settings["starting_soldiers"],
+            history_path=history_path,
+            resume=True,
+        )
+
+    def reset(self, resume=False):
         """Resets the environment state for a new tournament."""
-        self.current_round = 0
-        self.balances = {name: self.starting_soldiers for name in self.agent_names}
-        self.history = []
-        self.scores = {name: 0 for name in self.agent_names}
+        self._field_values = np.asarray(self.field_values, dtype=np.int64)
+        self.core = EnvState(len(self.agent_names), self.starting_soldiers)
+        self._named = None
+        if self.history_path is None:
+            self._history = HistoryStore(
+                self.agent_names, self.num_fields, self.total_rounds
+            )
+        else:
+            settings = {
+                "field_values": self._field_values.tolist(),
+                "total_rounds": self.total_rounds,
+                "starting_soldiers": self.starting_soldiers,
+            }
+            self._history = MemmapHistoryStore(
+                self.history_path,
+                self.agent_names,
+                self.num_fields,
+                self.total_rounds,
+                meta=settings,
+                resume=resume,
+            )
+        self.agent_index = self._history.agent_index
+        # Running per-field aggregates handed to agents that ask for them
+        self.stats = FieldStats(self.agent_names, self.num_fields)
+        if len(self._history):
+            self._restore()
         return self.get_state()
 
+    def _restore(self, chunk_rounds=1024):
+        """Recomputes balances, scores and stats from rounds already in the history."""
+        core = self.core
+        played = self._history.array()
+        for start in range(0, len(played), chunk_rounds):
+            chunk = np.asarray(played[start : start + chunk_rounds], dtype=np.int64)
+            winners, gains = resolve_fields(chunk, self._field_values)
+            core.balances -= chunk.sum(axis=(0, 2))
+            core.scores += gains.sum(axis=0)
+            for alloc_matrix, round_winners in zip(chunk, winners):
+                self.stats.update(alloc_matrix, round_winners)
+        core.current_round = len(played)
+
+    @property
+    def current_round(self):
+        return self.core.current_round
+
+    def _named_state(self):
+        """(balances, scores) keyed by name; built from the arrays at most once per round."""
+        if self._named is None:
+            core = self.core
+            self._named = (
+                dict(zip(self.agent_names, core.balances.tolist())),
+                dict(zip(self.agent_names, core.scores.tolist())),
+            )
+        return self._named
+
+    @property
+    def balances(self):
+        """
+        Read-only {agent_name: balance} as of the current round. Writing to it
+        raises TypeError; use get_state() or dict(env.balances) for a copy.
+        """
+        return MappingProxyType(self._named_state()[0])
+
+    @property
+    def scores(self):
+        """Read-only {agent_name: score} as of the current round, like balances."""
+        return MappingProxyType(self._named_state()[1])
+
+    @property
+    def history(self):
+        """Read-only list-of-dicts view over all rounds played so far."""
+        return self._history.view()
+
     def get_state(self):
-        """Returns the current state of the environment."""
+        """
+        Returns the current state of the environment.
+        History is a read-only view into the history store, not a copy.
+        """
+        balances, scores = self._named_state()
         return {
-            "balances": copy.deepcopy(self.balances),
-            "history": copy.deepcopy(self.history),
-            "scores": copy.deepcopy(self.scores),
-            "current_round": self.current_round,
+            "balances": dict(balances),
+            "history": self._history.view(),
+            "scores": dict(scores),
+            "current_round": self.core.current_round,
         }
 
     def step(self, round_allocations):
@@ -40,35 +168,44 @@ class Env:
         Processes one round of moves.
         round_allocations: dict {agent_name: [list of soldiers per field]}
         """
-        self.current_round += 1
+        # Matrix shape: (num_agents, num_fields)
+        alloc_matrix = np.array(
+            [round_allocations[name] for name in self.agent_names], dtype=np.int64
+        )
+        return self.step_matrix(alloc_matrix)
 
-        # 1. Deduct resources
-        for name, move in round_allocations.items():
-            self.balances[name] -= sum(move)
+    def step_matrix(self, alloc_matrix):
+        """Same as step, for an (num_agents, num_fields) matrix in agent_names order."""
+        round_winners, _ = self.advance(alloc_matrix)
+        return self.get_state(), round_winners.tolist()
 
-        # 2. Determine winners per field
-        # Matrix shape: (num_agents, num_fields)
-        alloc_matrix = np.array([round_allocations[name] for name in self.agent_names])
-        round_winners = []
-
-        for f in range(self.num_fields):
-            field_troops = alloc_matrix[:, f]
-            max_val = np.max(field_troops)
-
-            if max_val > 0:
-                # Find all indices that tied for the max
-                winners_idx = np.where(field_troops == max_val)[0]
-                if len(winners_idx) == 1:
-                    self.scores[self.agent_names[winners_idx[0]]] += int(
-                        self.field_values[f]
-                    )
-                    round_winners.append(winners_idx[0])
-                else:
-                    round_winners.append(-1)
-            else:
-                round_winners.append(-1)
-
-        # 3. Update history
-        self.history.append(copy.deepcopy(round_allocations))
-
-        return self.get_state(), round_winners
+    def advance(self, alloc_matrix):
+        """
+        Array-only core of step_matrix: resolves one round and returns
+        (winner index per field, points gained per agent) without building
+        any name-keyed state.
+        """
+        alloc_matrix = np.asarray(alloc_matrix, dtype=np.int64)
+        core = self.core
+        core.current_round += 1
+        self._named = None
+
+        # 1. Deduct resources and 2. determine winners per field, in one pass
+        round_winners, gains = resolve_fields(alloc_matrix, self._field_values)
+        core.balances -= alloc_matrix.sum(axis=1)
+        core.scores += gains
+
+        # 3. Update history and running stats
+        self._history.append(alloc_matrix)
+        self.stats.update(alloc_matrix, round_winners)
+        return round_winners, gains
+
+    def fast_forward(self, allocations, until=None):
+        """
+        Replays recorded (rounds, num_agents, num_fields) allocation matrices
+        from the current round up to round `until` (default: all of them).
+        """
+        until = len(allocations) if until is None else until
+        for alloc_matrix in allocations[self.core.current_round : until]:
+            self.advance(alloc_matrix)
+        return self.get_state()
@@ -0,0 +1,263 @@
+"""
+Approximate symmetric equilibria of one round of the game (a Blotto game).
+
+Every player splits its round budget into `units` equal chunks over the
+fields, so the actions are the compositions of `units` into num_fields parts.
+Fewer units are used when there are many fields, so that the table of actions
+stays within MAX_CELLS entries (see round_units).
+A field is won only by a unique highest bid. Against opponents drawing
+independently from the same mixed strategy, the chance that a bid of b units
+wins field f is P(opponent bid < b) ** num_opponents, which depends on that
+field alone. So the value of every action against a strategy is a gather
+over an (actions, fields) table, and one solver iteration costs
+O(actions x fields) NumPy work whatever the number of opponents.
+
+Solved strategies are cached on disk, keyed by configuration. Field order
+does not matter: strategies are solved for sorted values and permuted back.
+
+    python equilibrium.py --values 3 5 7 2 9
+    python equilibrium.py --precompute
+"""
+
+import os
+import json
+import math
+import hashlib
+import argparse
+import itertools
+import numpy as np
+
+# Budget chunks per round (fewer if the round budget is smaller)
+MAX_UNITS = 20
+# Largest (actions x fields) table solved; keeps a solve well under a second
+MAX_CELLS = 100_000
+ITERATIONS = 1000
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".equilibrium_cache")
+# Values field values are drawn from by run_tournament.py (upper bound exclusive)
+VALUE_RANGE = (2, 10)
+
+
+def num_actions(units, num_fields):
+    """Number of ways to split `units` chunks over num_fields fields."""
+    return math.comb(units + num_fields - 1, num_fields - 1)
+
+
+def compositions(units, num_fields):
+    """All (actions, num_fields) ways to split `units` chunks over the fields."""
+    bars = np.array(list(itertools.combinations(range(units + num_fields - 1), num_fields - 1)))
+    bars = bars.reshape(-1, num_fields - 1)
+    edges = np.hstack(
+        [np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), units + num_fields - 1)]
+    )
+    return np.diff(edges, axis=1) - 1
+
+
+class StageGame:
+    """
+    One round against num_opponents symmetric opponents. Precomputes the
+    flat (field, bid) index of every action so strategy marginals and action
+    values are one bincount and one gather each.
+    """
+
+    def __init__(self, field_values, units, num_opponents):
+        self.values = np.asarray(field_values, dtype=np.float64)
+        self.num_fields = len(self.values)
+        self.units = units
+        self.num_opponents = num_opponents
+        self.actions = compositions(units, self.num_fields)
+        self._flat = (np.arange(self.num_fields) * (units + 1) + self.actions).ravel()
+
+    def marginals(self, strategy):
+        """(fields, units + 1): probability `strategy` bids b units on each field."""
+        weights = np.repeat(strategy, self.num_fields)
+        pmf = np.bincount(self._flat, weights, minlength=self.num_fields * (self.units + 1))
+        return pmf.reshape(self.num_fields, self.units + 1)
+
+    def marginal_values(self, pmf):
+        """Expected points of every action against opponents with bid marginals pmf."""
+        below = np.zeros_like(pmf)
+        np.cumsum(pmf[:, :-1], axis=1, out=below[:, 1:])
+        win = np.clip(below, 0.0, 1.0) ** self.num_opponents
+        return win.ravel()[self._flat].reshape(-1, self.num_fields) @ self.values
+
+    def action_values(self, strategy):
+        """Expected points of every action against opponents all playing `strategy`."""
+        return self.marginal_values(self.marginals(strategy))
+
+    def exploitability(self, strategy):
+        """How many points the best action gains over `strategy` itself (0 at equilibrium)."""
+        u = self.action_values(strategy)
+        return float(u.max() - strategy @ u)
+
+
+def regret_matching(game, iterations=ITERATIONS):
+    """
+    Regret matching+ in self-play: regrets are floored at zero every
+    iteration and the average strategy weights iteration t by t.
+    Returns the average strategy.
+    """
+    num_actions = len(game.actions)
+    strategy = np.full(num_actions, 1 / num_actions)
+    regret = np.zeros(num_actions)
+    average = np.zeros(num_actions)
+    for t in range(1, iterations + 1):
+        u = game.action_values(strategy)
+        regret += u - strategy @ u
+        np.maximum(regret, 0, out=regret)
+        average += t * strategy
+        total = regret.sum()
+        strategy = regret / total if total > 0 else np.full(num_actions, 1 / num_actions)
+    return average / average.sum()
+
+
+def fictitious_play(game, iterations=ITERATIONS):
+    """
+    Self-play fictitious play: the average strategy moves towards its best
+    response. Each step shifts weight onto one action, so the bid marginals
+    are updated in O(fields) rather than rebuilt.
+    """
+    num_actions = len(game.actions)
+    fields = np.arange(game.num_fields)
+    average = np.full(num_actions, 1 / num_actions)
+    pmf = game.marginals(average)
+    for t in range(1, iterations + 1):
+        best = np.argmax(game.marginal_values(pmf))
+        average *= t / (t + 1)
+        average[best] += 1 / (t + 1)
+        pmf *= t / (t + 1)
+        pmf[fields, game.actions[best]] += 1 / (t + 1)
+    return average
+
+
+SOLVERS = {"regret": regret_matching, "fictitious": fictitious_play}
+
+
+def round_units(round_budget, num_fields, max_units=MAX_UNITS, max_cells=MAX_CELLS):
+    """
+    Chunks a round budget is split into: one per soldier, up to max_units,
+    and fewer if the action table would exceed max_cells. None if even two
+    chunks are too many; the caller should split its budget evenly instead.
+    """
+    wanted = int(max(1, min(max_units, round_budget)))
+    units = wanted
+    while units > 1 and num_actions(units, num_fields) * num_fields > max_cells:
+        units -= 1
+    if units == 1 and wanted > 1:
+        return None
+    return units
+
+
+def _cache_path(cache_dir, key):
+    digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{digest}.npz")
+
+
+def solve(
+    field_values,
+    units,
+    num_agents,
+    iterations=ITERATIONS,
+    method="fictitious",
+    cache_dir=CACHE_DIR,
+):
+    """
+    Approximate equilibrium of one round as (actions, probabilities).
+    actions: (n, num_fields) unit counts in the order of field_values;
+    only actions with non-negligible probability are returned.
+    cache_dir: directory of solved strategies (None to always solve).
+    """
+    values = np.asarray(field_values, dtype=np.int64)
+    order = np.argsort(values, kind="stable")
+    key = [values[order].tolist(), int(units), int(num_agents), iterations, method]
+
+    path = None if cache_dir is None else _cache_path(cache_dir, key)
+    if path is not None and os.path.exists(path):
+        with np.load(path) as cached:
+            actions, probs = cached["actions"], cached["probs"]
+    else:
+        game = StageGame(values[order], units, max(num_agents - 1, 0))
+        strategy = SOLVERS[method](game, iterations)
+        keep = strategy > 1e-4
+        actions, probs = game.actions[keep], strategy[keep] / strategy[keep].sum()
+        if path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = f"{path[:-4]}.{os.getpid()}.tmp.npz"
+            np.savez(tmp, actions=actions, probs=probs, key=json.dumps(key))
+            os.replace(tmp, path)
+
+    # Back from sorted field order to the caller's
+    unsorted = np.empty_like(actions)
+    unsorted[:, order] = actions
+    return unsorted, probs
+
+
+def to_allocation(shares, units, budget):
+    """Scales a unit split to `budget` soldiers, rounding down by largest remainder."""
+    exact = np.asarray(shares, dtype=np.float64) * budget / units
+    alloc = np.floor(exact).astype(np.int64)
+    left = int(budget - alloc.sum())
+    if left > 0:
+        alloc[np.argsort(alloc - exact, kind="stable")[:left]] += 1
+    return alloc
+
+
+def precompute(num_fields, units, num_agents, **kwargs):
+    """Solves every sorted combination of field values run_tournament.py can draw."""
+    values = range(*VALUE_RANGE)
+    combos = list(itertools.combinations_with_replacement(values, num_fields))
+    for i, combo in enumerate(combos):
+        solve(combo, units, num_agents, **kwargs)
+        print(f"\r{i + 1}/{len(combos)} solved", end="", flush=True)
+    print()
+
+
+if __name__ == "__main__":
+    import time
+    import tomllib
+
+    with open("config.toml", "rb") as f:
+        config = tomllib.load(f)
+    env = config["env"]
+
+    parser = argparse.ArgumentParser(description="Approximate equilibrium strategies of one round.")
+    parser.add_argument("--values", type=int, nargs="+", help="field values (default: random)")
+    parser.add_argument("--agents", type=int, default=None, help="players (default: tournament line-up)")
+    parser.add_argument("--units", type=int, default=None, help="budget chunks per round")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--method", choices=sorted(SOLVERS), default="fictitious")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument(
+        "--precompute",
+        action="store_true",
+        help="solve every combination of field values the tournament can draw",
+    )
+    args = parser.parse_args()
+
+    if args.agents is None:
+        from run_tournament import agent_files
+
+        args.agents = len(agent_files())
+    num_fields = len(args.values) if args.values else env["num_fields"]
+    units = args.units or round_units(env["start_balance"] // env["rounds"], num_fields)
+    if units is None:
+        parser.error(f"{num_fields} fields are too many to solve; pass --units")
+    settings = dict(iterations=args.iterations, method=args.method, cache_dir=args.cache_dir)
+
+    if args.precompute:
+        precompute(num_fields, units, args.agents, **settings)
+    else:
+        values = args.values or np.random.randint(*VALUE_RANGE, size=num_fields).tolist()
+        start = time.perf_counter()
+        actions, probs = solve(values, units, args.agents, **settings)
+        elapsed = time.perf_counter() - start
+
+        game = StageGame(values, units, args.agents - 1)
+        strategy = np.zeros(len(game.actions))
+        index = {tuple(a): i for i, a in enumerate(game.actions.tolist())}
+        strategy[[index[tuple(a)] for a in actions.tolist()]] = probs
+        print(f"Field values {values} | {args.agents} players | {units} units | {elapsed:.2f}s")
+        print(f"Exploitability: {game.exploitability(strategy):.4f} points per round")
+        print(f"Expected points per round: {strategy @ game.action_values(strategy):.3f}")
+        print("Most played splits:")
+        for i in np.argsort(-probs)[:10]:
+            print(f"  {actions[i].tolist()}  {100 * probs[i]:5.1f}%")
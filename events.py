@@ -0,0 +1,182 @@
+import queue
+import threading
+import numpy as np
+from typing import NamedTuple
+from history import history_args
+from stats import stats_kwargs
+from validation import VALID, validate_allocations
+from referee import MoveTimeout
+
+# Items a ThreadedSink may hold before the producer has to wait for it.
+SINK_QUEUE_SIZE = 64
+
+
+class RoundEvent(NamedTuple):
+    """
+    Outcome of one played round, as yielded by play_rounds. Arrays are in
+    agent_names (env) order; name-keyed dicts are only built when asked for.
+    allocations: (num_agents, num_fields) int64 moves after validation;
+    violations: validation code per agent (VALID if accepted).
+    winners: winning agent index per field (-1 for a tie or an empty field).
+    gains / score_array / balance_array: int64 per agent after the round.
+    """
+
+    round: int
+    agent_names: list
+    allocations: np.ndarray
+    violations: np.ndarray
+    winners: list
+    gains: np.ndarray
+    score_array: np.ndarray
+    balance_array: np.ndarray
+
+    def _named(self, values):
+        return dict(zip(self.agent_names, values.tolist()))
+
+    @property
+    def score_deltas(self):
+        """{agent_name: points won this round}"""
+        return self._named(self.gains)
+
+    @property
+    def scores(self):
+        return self._named(self.score_array)
+
+    @property
+    def balances(self):
+        return self._named(self.balance_array)
+
+    @property
+    def moves(self):
+        """{agent_name: list of soldiers per field} as played."""
+        return self._named(self.allocations)
+
+    @property
+    def invalid(self):
+        """Names of the agents whose move was rejected this round."""
+        return [n for n, v in zip(self.agent_names, self.violations) if v != VALID]
+
+
+def play_round(env, agents, verbose=True, referee=None):
+    """
+    Referees one round: gets moves, validates them, steps env and returns a
+    RoundEvent. With a referee, moves are subject to its time budgets and a
+    move that runs out of time falls back to zeros like any other invalid move.
+    """
+    # Only what agents are handed is built as name-keyed state
+    balances = dict(env.balances)
+    history_view = env.history
+    stats = env.stats
+    if referee is not None and stats is not None:
+        # A timed-out agent's thread can still be reading while env moves on
+        stats = stats.snapshot()
+    proposals = []
+
+    for agent in agents:
+        # Get raw move from participant code
+        history, kwargs = history_args(agent, history_view)
+        args = (
+            balances[agent.name],
+            env.field_values,
+            env.num_fields,
+            history,
+            balances,
+            env.total_rounds,
+            env.current_round + 1,
+        )
+        kwargs.update(stats_kwargs(agent, stats))
+        try:
+            if referee is not None:
+                move = referee.call(agent, *args, **kwargs)
+            else:
+                move = agent.get_allocation(*args, **kwargs)
+        except MoveTimeout as e:
+            if verbose:
+                print(f"{e}. Disqualifying round.")
+            move = [0] * env.num_fields
+        except Exception as e:
+            print(f"Agent {agent.name} crashed: {e}")
+            move = [0] * env.num_fields
+        proposals.append(move)
+
+    # Validate every agent's move in one vectorized pass
+    budgets = [balances[agent.name] for agent in agents]
+    moves, violations = validate_allocations(proposals, env.num_fields, budgets)
+    if verbose:
+        for agent in np.asarray(agents)[violations != VALID]:
+            print(f"Invalid move from {agent.name}. Disqualifying round.")
+
+    # Put the moves in env order unless the agents already are
+    names = [agent.name for agent in agents]
+    if names != env.agent_names:
+        order = [env.agent_index[n] for n in names]
+        moves[order] = moves.copy()
+        violations[order] = violations.copy()
+    winners, gains = env.advance(moves)
+    core = env.core
+    return RoundEvent(
+        round=core.current_round,
+        agent_names=env.agent_names,
+        allocations=moves,
+        violations=violations,
+        winners=winners.tolist(),
+        gains=gains,
+        score_array=core.scores.copy(),
+        balance_array=core.balances.copy(),
+    )
+
+
+def play_rounds(env, agents, verbose=True, referee=None):
+    """
+    Plays env's remaining rounds, yielding a RoundEvent as soon as each one
+    is resolved. Consumers (printing, rendering, writers) run between rounds,
+    so the loop itself does no output beyond referee messages.
+    """
+    while env.current_round < env.total_rounds:
+        yield play_round(env, agents, verbose, referee)
+
+
+class ThreadedSink:
+    """
+    Runs a slow consumer (e.g. a disk writer) on its own thread so the loop
+    producing items does not wait on it. Items are handed over through a
+    queue and processed in order; close() waits for the backlog and re-raises
+    the first error the consumer hit. The queue holds at most `maxsize` items,
+    so a producer that outruns the consumer is slowed down instead of piling
+    up memory.
+    """
+
+    def __init__(self, fn, maxsize=SINK_QUEUE_SIZE):
+        self.fn = fn
+        self._queue = queue.Queue(maxsize)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="sink", daemon=True)
+        self._thread.start()
+
+    def __call__(self, *args):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(args)
+
+    def _run(self):
+        while True:
+            args = self._queue.get()
+            if args is None:
+                return
+            if self._error is None:
+                try:
+                    self.fn(*args)
+                except Exception as e:
+                    self._error = e
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
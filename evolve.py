@@ -0,0 +1,218 @@
+"""
+Evolutionary search over ParametricAgent parameters.
+
+Every candidate plays a fixed set of BatchEnv games against the sample agents
+(and, with --self-play, the best candidate so far). Fitness is its mean score
+margin over the best opponent in each game. Candidates are evaluated in
+parallel worker processes. Fitness is deterministic for a given evaluation
+seed, so results are cached by parameter vector and re-used across
+generations and runs.
+
+    python evolve.py --generations 20 --population 24 --workers 4 --cache evolve_cache.json
+"""
+
+import os
+import json
+import random
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from batch_env import BatchEnv, draw_field_values
+from parametric_agent import BOUNDS, DEFAULT_PARAMS, PARAM_NAMES, ParametricAgent
+from run_tournament import config, load_agents
+
+# Cache keys round parameters to this many decimals
+KEY_DECIMALS = 4
+
+# Opponents loaded once per worker process
+_worker_opponents = None
+
+
+def _init_worker():
+    global _worker_opponents
+    _worker_opponents = load_agents()
+
+
+def evaluate(params, num_games, seed, champion=None):
+    """
+    Plays num_games batched games of the candidate against the opponents and
+    returns {"fitness", "win_rate", "mean_score"}. Field values and the
+    opponents' global RNGs are derived from seed, so equal inputs give equal results.
+    """
+    agents = [ParametricAgent("candidate", params)] + _worker_opponents
+    if champion is not None:
+        agents.append(ParametricAgent("champion", champion))
+    env_config = config["env"]
+    rng = np.random.default_rng(seed)
+    field_values = draw_field_values(num_games, env_config["num_fields"], rng)
+    random.seed(seed)
+    np.random.seed(seed)
+
+    env = BatchEnv(
+        [a.name for a in agents],
+        field_values,
+        num_fields=env_config["num_fields"],
+        total_rounds=env_config["rounds"],
+        starting_soldiers=env_config["start_balance"],
+    )
+    env.play(agents)
+    scores = env.scores
+    margin = scores[:, 0] - scores[:, 1:].max(axis=1)
+    return {
+        "fitness": float(margin.mean()),
+        "win_rate": float((env.game_winners() == 0).mean()),
+        "mean_score": float(scores[:, 0].mean()),
+    }
+
+
+def _evaluate_job(job):
+    return evaluate(*job)
+
+
+class FitnessCache:
+    """Fitness by (rounded parameters, evaluation settings), optionally kept in a JSON file."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+        self.hits = 0
+
+    @staticmethod
+    def key(params, num_games, seed, champion):
+        rounded = [round(float(p), KEY_DECIMALS) for p in params]
+        champ = None if champion is None else [round(float(p), KEY_DECIMALS) for p in champion]
+        env = config["env"]
+        setting = [num_games, seed, env["num_fields"], env["rounds"], env["start_balance"]]
+        return json.dumps([rounded, setting, champ])
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is not None:
+            self.hits += 1
+        return result
+
+    def save(self):
+        if self.path is not None:
+            with open(self.path, "w") as f:
+                json.dump(self.entries, f)
+
+
+def evaluate_population(population, cache, num_games, seed, champion, pool):
+    """Fitness of every candidate, evaluating only those not in the cache."""
+    keys = [cache.key(p, num_games, seed, champion) for p in population]
+    missing = {}
+    for key, params in zip(keys, population):
+        if cache.get(key) is None and key not in missing:
+            missing[key] = (params, num_games, seed, champion)
+    jobs = list(missing.values())
+    results = pool.map(_evaluate_job, jobs) if pool is not None else map(_evaluate_job, jobs)
+    for key, result in zip(missing, results):
+        cache.entries[key] = result
+    return [cache.entries[k] for k in keys]
+
+
+def next_generation(population, fitness, rng, elite=2, mutation=0.1):
+    """
+    Genetic step: the elite survive unchanged, the rest are blend crossovers of
+    tournament-selected parents plus Gaussian mutation scaled to each bound.
+    """
+    order = np.argsort(fitness)[::-1]
+    children = [population[i] for i in order[:elite]]
+    span = BOUNDS[:, 1] - BOUNDS[:, 0]
+    while len(children) < len(population):
+        a, b = (max(rng.choice(len(population), 3), key=lambda i: fitness[i]) for _ in range(2))
+        mix = rng.uniform(-0.25, 1.25, size=len(span))
+        child = population[a] + mix * (population[b] - population[a])
+        child = child + rng.normal(0, mutation, size=len(span)) * span
+        child = np.clip(child, BOUNDS[:, 0], BOUNDS[:, 1])
+        children.append(np.round(child, KEY_DECIMALS))
+    return children
+
+
+def evolve(
+    generations=20,
+    population_size=24,
+    num_games=64,
+    workers=1,
+    seed=0,
+    cache_path=None,
+    self_play=False,
+):
+    """Runs the search and returns (best parameters, their evaluation)."""
+    rng = np.random.default_rng(seed)
+    population = [DEFAULT_PARAMS.copy()] + [
+        np.round(rng.uniform(BOUNDS[:, 0], BOUNDS[:, 1]), KEY_DECIMALS)
+        for _ in range(population_size - 1)
+    ]
+    cache = FitnessCache(cache_path)
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker)
+    else:
+        _init_worker()
+
+    champion = None
+    best, best_result = None, None
+    try:
+        for gen in range(generations):
+            # With self-play the opponents change, so the best so far is re-scored
+            # against this generation's champion (usually a cache hit: it is an elite)
+            rescore = [best] if best is not None and champion is not None else []
+            results = evaluate_population(
+                population + rescore, cache, num_games, seed, champion, pool
+            )
+            if rescore:
+                best_result = results.pop()
+            fitness = [r["fitness"] for r in results]
+            top = int(np.argmax(fitness))
+            if best_result is None or fitness[top] > best_result["fitness"]:
+                best, best_result = population[top].copy(), results[top]
+            print(
+                f"gen {gen:>3} | best {fitness[top]:>7.2f} | mean {np.mean(fitness):>7.2f} "
+                f"| win {100 * results[top]['win_rate']:>5.1f}% | cache hits {cache.hits}"
+            )
+            if self_play:
+                champion = best
+            population = next_generation(population, fitness, rng)
+            cache.save()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return best, best_result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evolve ParametricAgent parameters.")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, default=24)
+    parser.add_argument("--games", type=int, default=64, help="batched games per evaluation")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", default=None, help="JSON file of evaluated parameter vectors")
+    parser.add_argument(
+        "--self-play",
+        action="store_true",
+        help="add the best candidate so far to the opponents",
+    )
+    parser.add_argument("--out", default=None, help="write the best parameters here as JSON")
+    args = parser.parse_args()
+
+    best, result = evolve(
+        args.generations,
+        args.population,
+        args.games,
+        args.workers,
+        args.seed,
+        args.cache,
+        args.self_play,
+    )
+    print("Best parameters:")
+    for name, value in zip(PARAM_NAMES, best):
+        print(f"  {name:<14} {value:.4f}")
+    print(f"Fitness {result['fitness']:.2f} | win rate {100 * result['win_rate']:.1f}%")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(dict(zip(PARAM_NAMES, best.tolist())), f, indent=2)
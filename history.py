@@ -0,0 +1,249 @@
+import os
+import json
+import threading
+import numpy as np
+from collections.abc import Sequence
+from types import MappingProxyType
+
+HISTORY_DTYPE = np.int32
+# MemmapHistoryStore keeps its metadata next to the .npy file: names and
+# settings in <path> + META_SUFFIX, the number of rounds recorded (one int64,
+# updated in place every round) in <path> + ROUNDS_SUFFIX
+META_SUFFIX = ".json"
+ROUNDS_SUFFIX = ".rounds"
+
+
+class FrozenRow(list):
+    """
+    A list that cannot be changed in place. History rows are shared by every
+    agent, so an edit by one agent would leak into what all others see. It
+    still compares, indexes and concatenates like a list; list(row),
+    row.copy() and copy.deepcopy give a plain list to edit.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("history rows are read-only; copy them with list(row)")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def copy(self):
+        return list(self)
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return list(self)
+
+    def __reduce__(self):
+        return FrozenRow, (list(self),)
+
+
+class HistoryStore:
+    """
+    Append-only store for per-round allocations.
+    Rounds are written into a preallocated (rounds, agents, fields) integer array,
+    so recording a round never copies what came before it.
+    """
+
+    def __init__(self, agent_names, num_fields, total_rounds, data=None):
+        """
+        data: optional existing (rounds, agents, fields) buffer to record into,
+        e.g. one game's slice of a BatchEnv history tensor.
+        """
+        self.agent_names = list(agent_names)
+        self.agent_index = MappingProxyType(
+            {name: i for i, name in enumerate(self.agent_names)}
+        )
+        self.num_fields = num_fields
+        if data is None:
+            data = np.zeros(
+                (max(total_rounds, 1), len(self.agent_names), num_fields),
+                dtype=HISTORY_DTYPE,
+            )
+        self._data = data
+        self._length = 0
+        self._round_cache = []
+        # A timed-out agent's thread may still be filling the cache (see referee.py)
+        self._round_lock = threading.Lock()
+
+    def __len__(self):
+        return self._length
+
+    def append(self, alloc_matrix):
+        """Records one round. alloc_matrix has shape (num_agents, num_fields)."""
+        if self._length == len(self._data):
+            # More rounds than planned (e.g. the UI replaying past total_rounds)
+            self._grow()
+        self._data[self._length] = alloc_matrix
+        self._length += 1
+
+    def _grow(self):
+        grown = np.zeros((2 * len(self._data),) + self._data.shape[1:], HISTORY_DTYPE)
+        grown[: self._length] = self._data[: self._length]
+        self._data = grown
+
+    def array(self, length=None):
+        """Read-only (rounds, agents, fields) view of the first `length` rounds."""
+        length = self._length if length is None else length
+        view = self._data[:length]
+        view.flags.writeable = False
+        return view
+
+    def round(self, idx):
+        """
+        Frozen {agent_name: allocation list} mapping for one round, built once
+        per round. Rows are FrozenRow lists, so they behave like the old
+        deep-copied lists but cannot be edited in place.
+        """
+        if idx < len(self._round_cache):
+            return self._round_cache[idx]
+        with self._round_lock:
+            while len(self._round_cache) <= idx:
+                rows = self.array(len(self._round_cache) + 1)[-1].tolist()
+                frozen = map(FrozenRow, rows)
+                self._round_cache.append(MappingProxyType(dict(zip(self.agent_names, frozen))))
+        return self._round_cache[idx]
+
+    def view(self, length=None):
+        """
+        Snapshot of the first `length` rounds (default: all recorded so far),
+        shaped like the old list of dicts.
+        """
+        return HistoryView(self, self._length if length is None else length)
+
+
+class MemmapHistoryStore(HistoryStore):
+    """
+    HistoryStore that records into a memory-mapped .npy file instead of RAM.
+    Every round is written straight into the file before the round counter
+    next to it is bumped. So another process can read the game while it runs
+    (load_history), and a restarted one can pick it up where it stopped.
+
+    resume: reopen an existing file and keep its rounds; otherwise any
+    existing file is replaced. meta: extra JSON-serializable data saved in
+    the sidecar (Env keeps its game settings there).
+    """
+
+    def __init__(self, path, agent_names, num_fields, total_rounds, meta=None, resume=False):
+        self.path = path
+        self.meta = {} if meta is None else dict(meta)
+        if resume and os.path.exists(path):
+            sidecar = read_history_meta(path)
+            if sidecar["agent_names"] != list(agent_names) or sidecar["num_fields"] != num_fields:
+                raise ValueError(f"{path} records a different game")
+            self.meta = {**sidecar["meta"], **self.meta}
+            data = np.load(path, mmap_mode="r+")
+            self._rounds = np.memmap(path + ROUNDS_SUFFIX, np.int64, mode="r+", shape=(1,))
+        else:
+            data = np.lib.format.open_memmap(
+                path,
+                mode="w+",
+                dtype=HISTORY_DTYPE,
+                shape=(max(total_rounds, 1), len(agent_names), num_fields),
+            )
+            self._rounds = np.memmap(path + ROUNDS_SUFFIX, np.int64, mode="w+", shape=(1,))
+        super().__init__(agent_names, num_fields, total_rounds, data=data)
+        self._length = int(self._rounds[0])
+
+        sidecar = {"agent_names": self.agent_names, "num_fields": num_fields, "meta": self.meta}
+        with open(path + META_SUFFIX, "w") as f:
+            json.dump(sidecar, f)
+
+    def append(self, alloc_matrix):
+        super().append(alloc_matrix)
+        # The row is in the file before the counter says it exists
+        self._rounds[0] = self._length
+
+    def _grow(self):
+        # A .npy cannot be resized in place: copy into a file twice as long
+        tmp = self.path + ".tmp"
+        grown = np.lib.format.open_memmap(
+            tmp,
+            mode="w+",
+            dtype=HISTORY_DTYPE,
+            shape=(2 * len(self._data),) + self._data.shape[1:],
+        )
+        grown[: self._length] = self._data[: self._length]
+        grown.flush()
+        os.replace(tmp, self.path)
+        self._data = grown
+
+    def flush(self):
+        """Writes dirty pages to disk (they are already visible to other processes)."""
+        self._data.flush()
+        self._rounds.flush()
+
+
+def read_history_meta(path):
+    """Metadata of a MemmapHistoryStore file: agent_names, num_fields, rounds, meta."""
+    with open(path + META_SUFFIX) as f:
+        sidecar = json.load(f)
+    sidecar["rounds"] = int(np.fromfile(path + ROUNDS_SUFFIX, np.int64, count=1)[0])
+    return sidecar
+
+
+def load_history(path):
+    """
+    Zero-copy, read-only (rounds, agents, fields) array of the rounds recorded
+    so far in a MemmapHistoryStore file, plus its metadata. Safe to call
+    while the game is still being written.
+    """
+    sidecar = read_history_meta(path)
+    data = np.load(path, mmap_mode="r")
+    return data[: sidecar["rounds"]], sidecar
+
+
+def history_args(agent, history):
+    """
+    The history argument and extra get_allocation kwargs for one agent.
+    Agents that set wants_array_history get the read-only (rounds, agents, fields)
+    array plus agent_index={name: row} instead of the list of dicts.
+    """
+    if getattr(agent, "wants_array_history", False):
+        return history.array, {"agent_index": history.store.agent_index}
+    return history, {}
+
+
+class HistoryView(Sequence):
+    """
+    List-like, read-only view of a HistoryStore.
+    Indexing returns the same frozen mapping per round, so handing this to every
+    agent every round costs O(1) instead of a deep copy of the whole game.
+    """
+
+    def __init__(self, store, length):
+        self._store = store
+        self._length = length
+        self._array = None
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._length))]
+        if idx < 0:
+            idx += self._length
+        if not 0 <= idx < self._length:
+            raise IndexError("history index out of range")
+        return self._store.round(idx)
+
+    @property
+    def store(self):
+        """The HistoryStore this view reads from."""
+        return self._store
+
+    @property
+    def array(self):
+        """Read-only (rounds, agents, fields) array backing this view."""
+        # Built once per view, however many agents ask for it
+        if self._array is None:
+            self._array = self._store.array(self._length)
+        return self._array
+
+    def __repr__(self):
+        return repr([dict(r) for r in self])
@@ -1,6 +1,7 @@
 import numpy as np
 import tomllib
 from env import Env
+from events import play_rounds
 import importlib.util
 import os
 from agent_class import AbstractAgent
@@ -100,6 +101,22 @@ def select_agents(folder_path="Sample_Agents"):
             return []
 
 
+def print_summary(event, field_values):
+    """Round summary table for one RoundEvent."""
+    print(f"\n--- ROUND {event.round} SUMMARY ---")
+    header = f"{'Field':<8} | {'Value':<5} | {'Winner':<12} | {'Allocations (You vs Others)'}"
+    print(header)
+    print("-" * len(header))
+
+    for i, w in enumerate(event.winners):
+        winner_name = event.agent_names[w] if w >= 0 else "TIE"
+        allocs = event.allocations[:, i].tolist()
+        print(f"Field {i:<2} | {field_values[i]:<5} | {winner_name:<12} | {allocs}")
+
+    print(f"\nScores:   {event.scores}")
+    print(f"Balances: {event.balances}")
+
+
 def play_game():
     with open("config.toml", "rb") as f:
         config = tomllib.load(f)
@@ -134,40 +151,10 @@ def play_game():
     print(f"Opponents: {[a.name for a in opponents]}")
     print(f"Field Values: {field_values}")
 
-    for r in range(1, rounds + 1):
-        current_state = env.get_state()
-        round_allocations = {}
-
-        # Get moves
-        for agent in all_agents:
-            move = agent.get_allocation(
-                current_state["balances"][agent.name],
-                env.field_values,
-                env.num_fields,
-                current_state["history"],
-                current_state["balances"],
-                env.total_rounds,
-                r,
-            )
-            round_allocations[agent.name] = move
-
-        # Step Environment
-        state, winners = env.step(round_allocations)
-
-        # Show Round Summary
-        print(f"\n--- ROUND {r} SUMMARY ---")
-        header = f"{'Field':<8} | {'Value':<5} | {'Winner':<12} | {'Allocations (You vs Others)'}"
-        print(header)
-        print("-" * len(header))
-
-        for i in range(num_fields):
-            winner_name = agent_names[winners[i]] if winners[i] >= 0 else "TIE"
-            allocs = [round_allocations[name][i] for name in agent_names]
-            print(f"Field {i:<2} | {field_values[i]:<5} | {winner_name:<12} | {allocs}")
-
-        print(f"\nScores:   {state['scores']}")
-        print(f"Balances: {state['balances']}")
+    for event in play_rounds(env, all_agents):
+        print_summary(event, field_values)
         input("\nPress Enter for next round...")
+    state = env.get_state()
 
     # Final Result
     max_score = max(state["scores"].values())
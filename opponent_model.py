@@ -0,0 +1,147 @@
+import math
+import numpy as np
+
+# Bid histogram bins per (agent, field); bids are bucketed into equal-width bins
+NUM_BINS = 64
+EWMA_ALPHA = 0.3
+# Dirichlet prior pseudo-soldiers per field before any split is observed
+DIRICHLET_PRIOR = 1.0
+
+
+class OpponentModel:
+    """
+    Per-agent, per-field bid distributions learned from the history one round
+    at a time. Every update is O(agents x fields):
+        - empirical bid CDF: histogram of bids in NUM_BINS equal-width bins
+        - EWMA of each bid and of its squared deviation
+        - Dirichlet-multinomial over how each agent splits its round spend
+          across fields (soldiers counted as draws), plus an EWMA of the spend
+
+    Queries are vectorized over fields and candidate bids at once.
+    max_bid: largest bid to resolve (the starting balance); bigger bids fall
+    in the top bin.
+    me: name of the agent using the model. Queries without explicit
+    opponents cover every other agent, so its own bids never count
+    against it. Without me they cover all agents.
+    """
+
+    def __init__(
+        self,
+        agent_names,
+        num_fields,
+        max_bid,
+        me=None,
+        num_bins=NUM_BINS,
+        alpha=EWMA_ALPHA,
+    ):
+        self.agent_names = list(agent_names)
+        self.agent_index = {name: i for i, name in enumerate(self.agent_names)}
+        self.me = me
+        self.num_fields = num_fields
+        self.alpha = alpha
+        self.width = max(1, math.ceil((max_bid + 1) / num_bins))
+        self.num_bins = math.ceil((max_bid + 1) / self.width)
+        self.rounds = 0
+
+        shape = (len(self.agent_names), num_fields)
+        self.counts = np.zeros(shape + (self.num_bins,), dtype=np.int64)
+        self.ewma = np.zeros(shape)
+        self.ewm_var = np.zeros(shape)
+        self.split_alpha = np.full(shape, DIRICHLET_PRIOR)
+        self.spend_ewma = np.zeros(len(self.agent_names))
+        self._rows = np.arange(len(self.agent_names))[:, None]
+        self._others = np.array([i for i, n in enumerate(self.agent_names) if n != me])
+        self._cols = np.arange(num_fields)
+        # Cumulative histogram, rebuilt on the first query after an update
+        self._cum = None
+
+    def update(self, alloc_matrix):
+        """Folds in one (agents, fields) round of bids."""
+        bids = np.asarray(alloc_matrix, dtype=np.int64)
+
+        # 1. Histogram
+        bins = np.minimum(bids // self.width, self.num_bins - 1)
+        self.counts[self._rows, self._cols, bins] += 1
+        self._cum = None
+
+        # 2. EWMA of bids and their spread, seeded with the first round
+        if self.rounds == 0:
+            self.ewma[...] = bids
+        else:
+            diff = bids - self.ewma
+            self.ewma += self.alpha * diff
+            self.ewm_var = (1 - self.alpha) * (self.ewm_var + self.alpha * diff**2)
+
+        # 3. Spend split: every soldier is one multinomial draw
+        self.split_alpha += bids
+        spend = bids.sum(axis=1)
+        if self.rounds == 0:
+            self.spend_ewma[...] = spend
+        else:
+            self.spend_ewma += self.alpha * (spend - self.spend_ewma)
+        self.rounds += 1
+
+    def observe(self, history):
+        """Catches up on the rounds of a (rounds, agents, fields) history not seen yet."""
+        for alloc_matrix in history[self.rounds :]:
+            self.update(alloc_matrix)
+
+    def _opponents(self, opponents):
+        if opponents is None:
+            return self._others
+        return np.array([self.agent_index[n] if isinstance(n, str) else n for n in opponents])
+
+    def below(self, bids, opponents=None):
+        """
+        Empirical P(opponent bids < b), shape (..., opponents, fields), for a
+        (..., fields) array of candidate bids. Within a bin the CDF is linear.
+        Agents with no rounds observed are assumed to bid 0.
+        """
+        bids = np.asarray(bids, dtype=np.int64)[..., None, :]
+        o = self._opponents(opponents)[:, None]
+        if self.rounds == 0:
+            shape = bids.shape[:-2] + (len(o), self.num_fields)
+            return np.broadcast_to(bids > 0, shape).astype(np.float64)
+
+        if self._cum is None:
+            self._cum = np.zeros(self.counts.shape[:2] + (self.num_bins + 1,))
+            np.cumsum(self.counts, axis=-1, out=self._cum[..., 1:])
+        b = np.clip(bids, 0, self.num_bins * self.width)
+        k = np.minimum(b // self.width, self.num_bins - 1)
+        frac = (b - k * self.width) / self.width
+        # (..., opponents, fields) lookups of every candidate bid's bin
+        below = self._cum[o, self._cols, k] + self.counts[o, self._cols, k] * frac
+        return below / self.rounds
+
+    def win_probability(self, bids, opponents=None, method="ecdf"):
+        """
+        P(bid b wins field f) for a (..., fields) array of candidate bids,
+        assuming opponents bid independently. A win needs a strictly higher
+        bid than every opponent.
+        method: "ecdf" (bid histogram) or "ewma" (normal around the EWMA,
+        through a logistic approximation of the normal CDF).
+        """
+        if method == "ewma":
+            idx = self._opponents(opponents)
+            bids = np.asarray(bids, dtype=np.float64)[..., None, :]
+            std = np.sqrt(self.ewm_var[idx]) + 0.5
+            z = (bids - 0.5 - self.ewma[idx]) / std
+            below = 1 / (1 + np.exp(-1.702 * z))
+        else:
+            below = self.below(bids, opponents)
+        return below.prod(axis=-2)
+
+    def expected_value(self, bids, field_values, opponents=None, method="ecdf"):
+        """Expected points of each candidate allocation, shape (...)."""
+        win = self.win_probability(bids, opponents, method)
+        return (win * np.asarray(field_values)).sum(axis=-1)
+
+    def split_shares(self, opponents=None):
+        """Posterior mean share of its spend each agent puts on each field."""
+        alpha = self.split_alpha[self._opponents(opponents)]
+        return alpha / alpha.sum(axis=-1, keepdims=True)
+
+    def predicted_bids(self, opponents=None):
+        """Expected next bids, (opponents, fields): posterior split x EWMA spend."""
+        idx = self._opponents(opponents)
+        return self.split_shares(opponents) * self.spend_ewma[idx, None]
@@ -0,0 +1,115 @@
+import numpy as np
+from agent_class import AbstractAgent
+
+# Tunable parameters and their search bounds
+PARAM_NAMES = (
+    "spend_ratio",  # multiple of the fair share (balance / rounds left) spent per round
+    "aggression",  # how much the spend ratio rises (>0) or falls (<0) over the game
+    "value_weight",  # priority of a field's value
+    "heat_weight",  # penalty on how contested a field has been
+    "overbid",  # bid this fraction above a field's historical heat
+    "focus",  # fraction of fields contested at most
+)
+BOUNDS = np.array(
+    [
+        [0.3, 2.0],
+        [-1.0, 1.0],
+        [0.0, 2.0],
+        [0.0, 2.0],
+        [0.0, 1.0],
+        [0.1, 1.0],
+    ]
+)
+# Close to patient_agent: lean spending, cheap fields first
+DEFAULT_PARAMS = np.array([0.8, 0.5, 0.5, 1.0, 0.0, 1.0])
+
+
+class ParametricAgent(AbstractAgent):
+    """
+    Heat-based strategy in the spirit of patient_agent, with every constant
+    exposed as a parameter (see PARAM_NAMES) so it can be tuned by evolve.py.
+    All the work happens in get_allocation_batch; get_allocation runs it as
+    a batch of one game.
+    """
+
+    wants_array_history = True
+
+    def __init__(self, name, params=None):
+        super().__init__(name)
+        params = DEFAULT_PARAMS if params is None else params
+        self.params = np.clip(np.asarray(params, dtype=np.float64), BOUNDS[:, 0], BOUNDS[:, 1])
+
+    def get_allocation(
+        self,
+        current_balance,
+        field_values,
+        num_fields,
+        history,
+        balances,
+        total_rounds,
+        current_round,
+        agent_index=None,
+    ) -> list:
+        move = self.get_allocation_batch(
+            np.array([current_balance]),
+            np.asarray(field_values)[None],
+            num_fields,
+            history[None],
+            np.array([[balances[n] for n in agent_index]]),
+            total_rounds,
+            current_round,
+            agent_index,
+        )
+        return move[0].tolist()
+
+    def get_allocation_batch(
+        self,
+        current_balance,
+        field_values,
+        num_fields,
+        history,
+        balances,
+        total_rounds,
+        current_round,
+        agent_index,
+    ):
+        spend_ratio, aggression, value_weight, heat_weight, overbid, focus = self.params
+        current_balance = np.asarray(current_balance, dtype=np.int64)
+        rounds_left = total_rounds - current_round + 1
+
+        # 1. Round budget: a scheduled multiple of the fair share, everything at the end
+        progress = (current_round - 1) / max(total_rounds - 1, 1)
+        ratio = max(spend_ratio * (1 + aggression * (progress - 0.5)), 0.0)
+        if rounds_left <= 1:
+            budget = current_balance
+        else:
+            budget = (current_balance * min(1.0, ratio / rounds_left)).astype(np.int64)
+
+        # 2. Heat: mean over past rounds of the highest opposing bid per field
+        others = [i for name, i in agent_index.items() if name != self.name]
+        if history.shape[1] == 0 or not others:
+            heat = np.zeros(field_values.shape)
+        else:
+            heat = history[:, :, others].max(axis=2).mean(axis=1)
+        cost = np.floor(heat * (1 + overbid)).astype(np.int64) + 1
+
+        # 3. Priority order, then take fields while the budget lasts
+        values = field_values / np.maximum(field_values.max(axis=1, keepdims=True), 1)
+        heat_norm = heat / (heat.max(axis=1, keepdims=True) + 1)
+        order = np.argsort(-(value_weight * values - heat_weight * heat_norm), axis=1, kind="stable")
+        sorted_cost = np.take_along_axis(cost, order, axis=1)
+        max_fields = max(1, int(np.ceil(focus * num_fields)))
+        take = (np.cumsum(sorted_cost, axis=1) <= budget[:, None]) & (
+            np.arange(num_fields) < max_fields
+        )
+
+        # 4. Leftover budget is spread over the fields taken (or the top ones if none)
+        spend = np.where(take, sorted_cost, 0)
+        take[~take.any(axis=1), :max_fields] = True
+        n_take = take.sum(axis=1)
+        extra = (budget - spend.sum(axis=1)) // n_take
+        spend = spend + np.where(take, extra[:, None], 0)
+
+        move = np.zeros_like(spend)
+        np.put_along_axis(move, order, spend, axis=1)
+        return move
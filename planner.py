@@ -0,0 +1,118 @@
+import math
+import numpy as np
+from best_response import value_curve
+
+# Budget grid points the DP works on; spending is planned in multiples of
+# total_budget / RESOLUTION soldiers
+RESOLUTION = 200
+# Relative change of the price curve that makes the cached tables stale
+TOLERANCE = 0.02
+# Rebuild budget: DP tables built over a game may not exceed FREE_TABLES plus
+# TABLES_PER_ROUND per observed round (one table is ~0.3 ms at RESOLUTION 200)
+FREE_TABLES = 500
+TABLES_PER_ROUND = 2
+
+
+class BudgetPlanner:
+    """
+    Splits a balance over the remaining rounds to maximise total expected value.
+
+    The price curve v(s) is the expected value won by spending s soldiers in
+    one round, averaged over the rounds observed so far. Spending is solved by
+    DP over rounds on a fixed budget grid:
+        f_k(b) = max over s <= b of v(s) + f_{k-1}(b - s)
+    where f_k is the best value from k rounds with b soldiers.
+
+    Tables f_1..f_k are kept between calls. A later round only looks up a
+    smaller k. They are rebuilt only when the learned curve moves by more than
+    `tolerance`, and then only up to the rounds still to play. Early in a long
+    game the curve moves almost every round, so rebuilds are also throttled:
+    once the first tables exist, a rebuild must fit in the budget of
+    free_tables + tables_per_round * rounds observed tables for the game.
+    """
+
+    def __init__(
+        self,
+        total_budget,
+        resolution=RESOLUTION,
+        tolerance=TOLERANCE,
+        free_tables=FREE_TABLES,
+        tables_per_round=TABLES_PER_ROUND,
+    ):
+        self.unit = max(1, math.ceil(total_budget / resolution))
+        self.size = total_budget // self.unit + 1
+        self.tolerance = tolerance
+        self.free_tables = free_tables
+        self.tables_per_round = tables_per_round
+        # DP tables built so far
+        self.tables_built = 0
+        self.rounds_seen = 0
+        self._curve_sum = np.zeros(self.size)
+        # Curve the cached tables were built from, and f_0 .. f_k on the grid
+        self._table_curve = None
+        self._tables = [np.zeros(self.size)]
+        self._best_spend = [np.zeros(self.size, dtype=np.int64)]
+        # (b, s) -> b - s, and the s <= b mask; fixed for the planner's lifetime
+        grid = np.arange(self.size)
+        self._rest = grid[:, None] - grid[None, :]
+        self._feasible = self._rest >= 0
+        np.maximum(self._rest, 0, out=self._rest)
+
+    @property
+    def curve(self):
+        """Mean price curve on the grid: expected value of spending i * unit soldiers."""
+        if self.rounds_seen == 0:
+            return self._curve_sum
+        return self._curve_sum / self.rounds_seen
+
+    def observe(self, curve):
+        """
+        Adds one round's price curve: curve[s] is the value s soldiers would
+        have won that round (e.g. best_response.value_curve). Curves shorter
+        than the budget are extended with their last value.
+        """
+        curve = np.asarray(curve, dtype=np.float64)
+        points = np.minimum(np.arange(self.size) * self.unit, len(curve) - 1)
+        self._curve_sum += curve[points]
+        self.rounds_seen += 1
+
+    def observe_bids(self, field_values, opponent_bids):
+        """Adds the price curve of a round in which opponents bid opponent_bids."""
+        curve = value_curve(field_values, opponent_bids, self.size - 1, unit=self.unit)
+        self._curve_sum += curve
+        self.rounds_seen += 1
+
+    def _stale(self, rounds_left):
+        if self._table_curve is None:
+            return True
+        budget = self.free_tables + self.tables_per_round * self.rounds_seen
+        if self.tables_built + rounds_left > budget:
+            return False
+        drift = np.abs(self.curve - self._table_curve).max()
+        return drift > self.tolerance * max(self._table_curve.max(), 1e-9)
+
+    def _extend(self, rounds):
+        """Builds f_k up to k = rounds, reusing the tables already built."""
+        curve = self._table_curve
+        while len(self._tables) <= rounds:
+            prev = self._tables[-1]
+            totals = np.where(self._feasible, curve[None, :] + prev[self._rest], -np.inf)
+            best = totals.argmax(axis=1)
+            self._best_spend.append(best)
+            self._tables.append(totals[np.arange(self.size), best])
+            self.tables_built += 1
+
+    def plan(self, balance, rounds_left):
+        """Soldiers to spend this round out of balance, with rounds_left rounds to go (this one included)."""
+        if rounds_left <= 1 or self.rounds_seen == 0:
+            return balance if rounds_left <= 1 else balance // rounds_left
+
+        if self._stale(rounds_left):
+            self._table_curve = self.curve.copy()
+            self._tables = self._tables[:1]
+            self._best_spend = self._best_spend[:1]
+        self._extend(rounds_left)
+
+        b = min(balance // self.unit, self.size - 1)
+        spend = int(self._best_spend[rounds_left][b]) * self.unit
+        return min(spend, balance)
@@ -3,13 +3,17 @@ import math
 import sys
 import numpy as np
 import tomllib
+import threading
+from collections import OrderedDict
 
 try:
     from env import Env
     from agent_class import AbstractAgent
     from utils import select_agents
+    from events import play_rounds
+    from referee import Referee
 except ImportError:
-    print("CRITICAL: Requires 'env', 'agent_class', and 'utils' to be present.")
+    print("CRITICAL: Requires 'env', 'agent_class', 'utils', 'events' and 'referee' to be present.")
     sys.exit()
 
 
@@ -18,6 +22,14 @@ BG_COLOR = (30, 33, 40)
 TEXT_COLOR = (220, 220, 220)
 ACCENT_COLOR = (255, 215, 0)
 FPS = 60
+# Troops take this long to reach the fields, whatever the frame rate
+DEPLOY_SECONDS = 0.8
+# Seconds an opponent may think before its move counts as all zeros
+MOVE_TIMEOUT = 2.0
+# Dots of the "thinking" indicator advance this often
+THINK_DOT_MS = 300
+# Above this many changed areas a frame is redrawn and flipped whole
+MAX_DIRTY_RECTS = 64
 
 PLAYER_COLORS = [
     (80, 200, 120),  # Human (Emerald)
@@ -25,10 +37,36 @@ PLAYER_COLORS = [
     (100, 150, 255),  # Opponent 2 (Blue)
     (200, 100, 200),  # Violet
 ]
+# Rendered text surfaces kept by TextCache
+TEXT_CACHE_SIZE = 512
+
+
+class TextCache:
+    """
+    Rendered text surfaces keyed by (font, text, color), least recently used
+    evicted first. Labels repeat from frame to frame, so font.render runs
+    only when a label changes.
+    """
+
+    def __init__(self, maxsize=TEXT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.maxsize:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
 
 
 class InteractiveGame:
-    def __init__(self, env, human_agent, opponents):
+    def __init__(self, env, human_agent, opponents, move_timeout=MOVE_TIMEOUT):
         pygame.init()
         self.screen = pygame.display.set_mode(SCREEN_SIZE)
         pygame.display.set_caption("Interactive Mode")
@@ -39,6 +77,13 @@ class InteractiveGame:
         self.human_agent = human_agent
         self.opponents = opponents
         self.all_agents = [human_agent] + opponents
+        # Opponents move on a background thread (see trigger_turn_calculation),
+        # each under the referee's deadline, so the window keeps responding
+        self.referee = Referee(move_timeout)
+        self.rounds = play_rounds(env, self.all_agents, verbose=False, referee=self.referee)
+        self.worker = None
+        self.pending = None
+        self.running = True
 
         # map agent names to colors
         self.agent_colors = {
@@ -55,6 +100,16 @@ class InteractiveGame:
         # Calculate Positions
         self._calculate_layout()
 
+        # Rendering: cached labels, the layers that never change, and the
+        # screen areas drawn last frame (restored from the static layer next frame)
+        self.text = TextCache()
+        self.static_layer = self._render_static_layer()
+        self.dirty_rects = []
+        self.full_redraw = True
+
+        # Scores and balances as of the last resolved round
+        self.snapshot = self._take_snapshot()
+
         # Game State
         self.round_idx = 0
         self.current_allocations = [0] * self.env.num_fields  # User's current plan
@@ -74,6 +129,8 @@ class InteractiveGame:
 
     def reset(self):
         self.env.reset()
+        self.referee.new_game()
+        self.rounds = play_rounds(self.env, self.all_agents, verbose=False, referee=self.referee)
         self.state = "INPUT"
         self.round_idx = 0
         self.current_allocations = [0] * self.env.num_fields
@@ -81,6 +138,12 @@ class InteractiveGame:
         self.round_winners = []
         self.anim_progress = 0.0
         self.timer = 0
+        self.snapshot = self._take_snapshot()
+        self.full_redraw = True
+
+    def _take_snapshot(self):
+        state = self.env.get_state()
+        return {"scores": state["scores"], "balances": state["balances"]}
 
     def _calculate_layout(self):
         """Pre-calculate positions for fields and players"""
@@ -136,8 +199,7 @@ class InteractiveGame:
                         return
 
                     # Check Fields
-                    state = self.env.get_state()
-                    current_balance = state["balances"][self.human_agent.name]
+                    current_balance = self.snapshot["balances"][self.human_agent.name]
                     current_committed = sum(self.current_allocations)
                     remaining = current_balance - current_committed
 
@@ -160,41 +222,64 @@ class InteractiveGame:
                                 to_remove = min(increment, self.current_allocations[i])
                                 self.current_allocations[i] -= to_remove
 
+            elif self.state == "NEXT_ROUND":
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
+                    self.advance_round()
+
+            elif self.state == "END":
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
+                    self.reset()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    self.running = False
+
     def trigger_turn_calculation(self):
-        """Runs the actual game logic step once user hits submit"""
+        """Starts resolving the round on a background thread once user hits submit"""
+        self.human_agent.move = list(self.current_allocations)
         self.state = "CALCULATE"
+        self.think_start = pygame.time.get_ticks()
+        self.pending = None
+        self.worker = threading.Thread(target=self._play_round, name="opponents", daemon=True)
+        self.worker.start()
+
+    def _play_round(self):
+        """Worker thread: gets every move (under the referee's deadline) and steps the env."""
+        try:
+            self.pending = next(self.rounds, None)
+        except Exception as e:
+            self.pending = e
+
+    def advance_round(self):
+        self.round_idx += 1
+        if self.round_idx >= self.env.total_rounds:
+            self.state = "END"
+        else:
+            # Reset for next input
+            self.current_allocations = [0] * self.env.num_fields
+            self.state = "INPUT"
+
+    def update(self, dt):
+        """Advances animations by dt seconds, independent of the frame rate."""
+        if self.state == "CALCULATE":
+            if self.worker.is_alive():
+                return
+            event = self.pending
+            if isinstance(event, Exception):
+                raise event
+            if event is None:
+                # The game already ended; nothing left to resolve
+                self.state = "END"
+                return
 
-        state = self.env.get_state()
-        moves = {self.human_agent.name: self.current_allocations}
-
-        for opp in self.opponents:
-            try:
-                move = opp.get_allocation(
-                    current_balance=state["balances"][opp.name],
-                    field_values=self.env.field_values,
-                    num_fields=self.env.num_fields,
-                    history=state["history"],
-                    balances=state["balances"],
-                    total_rounds=self.env.total_rounds,
-                    current_round=self.round_idx + 1,
-                )
-                moves[opp.name] = move
-            except Exception as e:
-                print(f"Error getting move from {opp.name}: {e}")
-                moves[opp.name] = [0] * self.env.num_fields  # Fallback
-
-        new_state, winners = self.env.step(moves)
-
-        self.last_round_data = new_state["history"][-1]
-        self.last_round_winners = winners
-
-        # Transition to Animation
-        self.state = "DEPLOY"
-        self.anim_progress = 0.0
+            self.last_round_data = event.moves
+            self.last_round_winners = event.winners
+            self.snapshot = {"scores": event.scores, "balances": event.balances}
+
+            # Transition to Animation
+            self.state = "DEPLOY"
+            self.anim_progress = 0.0
 
-    def update(self):
-        if self.state == "DEPLOY":
-            self.anim_progress += 0.02
+        elif self.state == "DEPLOY":
+            self.anim_progress += dt / DEPLOY_SECONDS
             if self.anim_progress >= 1.0:
                 self.anim_progress = 1.0
                 self.state = "RESOLVE"
@@ -203,39 +288,77 @@ class InteractiveGame:
         elif self.state == "RESOLVE":
             self.state = "NEXT_ROUND"
 
-        elif self.state == "NEXT_ROUND":
-            self.round_idx += 1
-            if self.round_idx >= self.env.total_rounds:
-                self.state = "END"
-            else:
-                # Reset for next input
-                self.current_allocations = [0] * self.env.num_fields
-                self.state = "INPUT"
+    def _render_static_layer(self):
+        """Background, bare fields with their values and empty player boxes; drawn once."""
+        layer = pygame.Surface(SCREEN_SIZE).convert()
+        layer.fill(BG_COLOR)
 
-    def draw_battlefields(self):
         for i, pos in enumerate(self.field_positions):
-            # Base Circle
-            color = (80, 80, 80)
+            pygame.draw.circle(layer, (80, 80, 80), pos, self.field_radius)
+            pygame.draw.circle(layer, (200, 200, 200), pos, self.field_radius, 2)
+            val_lbl = self.font_m.render(str(self.env.field_values[i]), True, (255, 255, 255))
+            layer.blit(val_lbl, val_lbl.get_rect(center=pos))
 
+        for name, pos in self.player_positions.items():
+            color = self.agent_colors[name]
+            name_lbl = self.font_m.render(name, True, color)
+            layer.blit(name_lbl, (pos[0] - 50, pos[1] - 70))
+
+            rect = pygame.Rect(0, 0, 160, 70)
+            rect.center = pos
+            pygame.draw.rect(layer, (50, 54, 62), rect, border_radius=8)
+            pygame.draw.rect(layer, color, rect, 2, border_radius=8)
+        return layer
+
+    def _mark(self, rect):
+        self.frame_rects.append(rect)
+
+    def _blit(self, surface, dest):
+        self._mark(self.screen.blit(surface, dest))
+
+    def _text(self, font, text, color, **anchor):
+        """Blits a cached label positioned by a Rect keyword (center=, topleft=, ...)."""
+        surface = self.text.render(font, text, color)
+        self._blit(surface, surface.get_rect(**anchor))
+
+    def begin_frame(self):
+        """Restores whatever was drawn over the static layer last frame."""
+        # Many small rects cost more than one full-screen copy
+        if len(self.dirty_rects) > MAX_DIRTY_RECTS:
+            self.full_redraw = True
+        if self.full_redraw:
+            self.screen.blit(self.static_layer, (0, 0))
+        else:
+            for rect in self.dirty_rects:
+                self.screen.blit(self.static_layer, rect, rect)
+        self.frame_rects = []
+
+    def end_frame(self):
+        """Pushes only the areas that changed since the last frame to the display."""
+        if self.full_redraw or len(self.frame_rects) > MAX_DIRTY_RECTS:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.dirty_rects + self.frame_rects)
+        self.dirty_rects = self.frame_rects
+        self.full_redraw = False
+
+    def draw_battlefields(self):
+        for i, pos in enumerate(self.field_positions):
             # Highlight winner if in RESOLVE state
             if self.state in ["RESOLVE", "NEXT_ROUND", "END"]:
                 w_idx = self.last_round_winners[i]
                 if w_idx != -1:  # Not a tie
                     winner_name = self.all_agents[w_idx].name
                     color = self.agent_colors[winner_name]
-                    # Draw a glow
-                    pygame.draw.circle(
-                        self.screen, color, pos, self.field_radius + 8, 4
+                    # Draw a glow, then the field in the winner's color
+                    self._mark(
+                        pygame.draw.circle(self.screen, color, pos, self.field_radius + 8, 4)
+                    )
+                    pygame.draw.circle(self.screen, color, pos, self.field_radius)
+                    pygame.draw.circle(self.screen, (200, 200, 200), pos, self.field_radius, 2)
+                    self._text(
+                        self.font_m, str(self.env.field_values[i]), (255, 255, 255), center=pos
                     )
-
-            pygame.draw.circle(self.screen, color, pos, self.field_radius)
-            pygame.draw.circle(self.screen, (200, 200, 200), pos, self.field_radius, 2)
-
-            # Value Label
-            val_lbl = self.font_m.render(
-                str(self.env.field_values[i]), True, (255, 255, 255)
-            )
-            self.screen.blit(val_lbl, val_lbl.get_rect(center=pos))
 
             # INPUT STATE: Show user current allocation
             if self.state == "INPUT":
@@ -243,8 +366,7 @@ class InteractiveGame:
                 if alloc > 0:
                     # Draw green badge
                     badge_pos = (pos[0], pos[1] + self.field_radius + 20)
-                    txt = self.font_m.render(f"+{alloc}", True, PLAYER_COLORS[0])
-                    self.screen.blit(txt, txt.get_rect(center=badge_pos))
+                    self._text(self.font_m, f"+{alloc}", PLAYER_COLORS[0], center=badge_pos)
 
     def draw_troops_anim(self):
         """Animates troops moving from players to fields"""
@@ -269,12 +391,11 @@ class InteractiveGame:
                 cy = start_pos[1] + (end_pos[1] - start_pos[1]) * self.anim_progress
                 size = min(8 + count, 25)
 
-                pygame.draw.circle(self.screen, color, (cx, cy), size)
+                self._mark(pygame.draw.circle(self.screen, color, (cx, cy), size))
 
                 # Draw number inside if large enough
                 if size > 12:
-                    lbl = self.font_s.render(str(int(count)), True, (0, 0, 0))
-                    self.screen.blit(lbl, lbl.get_rect(center=(cx, cy)))
+                    self._text(self.font_s, str(int(count)), (0, 0, 0), center=(cx, cy))
 
     def draw_results_static(self):
         """Shows static troop counts on fields after animation"""
@@ -304,41 +425,27 @@ class InteractiveGame:
                 by = pos[1] + orbit_radius * math.sin(angle)
 
                 color = self.agent_colors[name]
-                pygame.draw.circle(self.screen, color, (bx, by), 15)
-
-                lbl = self.font_s.render(str(int(count)), True, (0, 0, 0))
-                self.screen.blit(lbl, lbl.get_rect(center=(bx, by)))
+                self._mark(pygame.draw.circle(self.screen, color, (bx, by), 15))
+                self._text(self.font_s, str(int(count)), (0, 0, 0), center=(bx, by))
 
     def draw_hud(self):
-        state = self.env.get_state()
+        state = self.snapshot
 
         # Round Info
-        round_txt = self.font_l.render(
-            f"ROUND {self.round_idx + 1} / {self.env.total_rounds}", True, TEXT_COLOR
+        self._text(
+            self.font_l,
+            f"ROUND {self.round_idx + 1} / {self.env.total_rounds}",
+            TEXT_COLOR,
+            topleft=(30, 30),
         )
-        self.screen.blit(round_txt, (30, 30))
 
-        # Player Stats
+        # Player Stats (names and boxes are on the static layer)
         for name, pos in self.player_positions.items():
-            color = self.agent_colors[name]
-            score = state["scores"][name]
-            balance = state["balances"][name]
-
-            # Name
-            name_lbl = self.font_m.render(name, True, color)
-            self.screen.blit(name_lbl, (pos[0] - 50, pos[1] - 70))
-
-            # Stats Box
             rect = pygame.Rect(0, 0, 160, 70)
             rect.center = pos
-            pygame.draw.rect(self.screen, (50, 54, 62), rect, border_radius=8)
-            pygame.draw.rect(self.screen, color, rect, 2, border_radius=8)
-
-            score_txt = self.font_s.render(f"Score: {score}", True, ACCENT_COLOR)
-            bal_txt = self.font_s.render(f"Troops: {balance}", True, TEXT_COLOR)
-
-            self.screen.blit(score_txt, (rect.x + 10, rect.y + 10))
-            self.screen.blit(bal_txt, (rect.x + 10, rect.y + 35))
+            score, balance = state["scores"][name], state["balances"][name]
+            self._text(self.font_s, f"Score: {score}", ACCENT_COLOR, topleft=(rect.x + 10, rect.y + 10))
+            self._text(self.font_s, f"Troops: {balance}", TEXT_COLOR, topleft=(rect.x + 10, rect.y + 35))
 
         if self.state == "INPUT":
             # Balance Calculation
@@ -347,39 +454,49 @@ class InteractiveGame:
             remaining = current_bal - allocated
 
             # Instructions
-            instr = self.font_s.render(
-                "L-Click: +1 | R-Click: -1 | Shift: +/- 5", True, (150, 150, 150)
+            self._text(
+                self.font_s,
+                "L-Click: +1 | R-Click: -1 | Shift: +/- 5",
+                (150, 150, 150),
+                topleft=(20, SCREEN_SIZE[1] - 40),
             )
-            self.screen.blit(instr, (20, SCREEN_SIZE[1] - 40))
 
             # Remaining Troops Center Display
             rem_color = (100, 255, 100) if remaining >= 0 else (255, 50, 50)
-            rem_txt = self.font_l.render(f"Remaining: {remaining}", True, rem_color)
-            self.screen.blit(rem_txt, (SCREEN_SIZE[0] // 2 - 140, SCREEN_SIZE[1] - 180))
+            self._text(
+                self.font_l,
+                f"Remaining: {remaining}",
+                rem_color,
+                topleft=(SCREEN_SIZE[0] // 2 - 140, SCREEN_SIZE[1] - 180),
+            )
 
             # Submit Button
             btn_color = (
                 (40, 100, 40) if remaining >= 0 else (60, 60, 60)
             )  # Dark green if valid, grey if not
-            pygame.draw.rect(
-                self.screen, btn_color, self.submit_btn_rect, border_radius=10
+            self._mark(
+                pygame.draw.rect(self.screen, btn_color, self.submit_btn_rect, border_radius=10)
             )
             pygame.draw.rect(
                 self.screen, (100, 200, 100), self.submit_btn_rect, 2, border_radius=10
             )
-
-            btn_lbl = self.font_m.render("DEPLOY", True, (255, 255, 255))
-            self.screen.blit(
-                btn_lbl, btn_lbl.get_rect(center=self.submit_btn_rect.center)
+            self._text(
+                self.font_m, "DEPLOY", (255, 255, 255), center=self.submit_btn_rect.center
             )
 
+    def draw_thinking(self):
+        if self.state != "CALCULATE":
+            return
+        dots = "." * ((pygame.time.get_ticks() - self.think_start) // THINK_DOT_MS % 4)
+        W, H = SCREEN_SIZE
+        self._text(self.font_l, f"Opponents thinking{dots}", TEXT_COLOR, midleft=(W // 2 - 170, H - 160))
+
     def draw_game_over(self):
         overlay = pygame.Surface(SCREEN_SIZE, pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 200))
-        self.screen.blit(overlay, (0, 0))
+        self._blit(overlay, (0, 0))
 
-        final_scores = self.env.get_state()["scores"]
-        # final_scores = {"random_agent": 51, "uniform_agent": 122, "Your Agent": 122}
+        final_scores = self.snapshot["scores"]
         max_score = max(final_scores.values())
         winners = [k for k in final_scores.keys() if final_scores.get(k) == max_score]
         if len(winners) > 1:
@@ -387,67 +504,69 @@ class InteractiveGame:
         else:
             txt = f"WINNER: {winners[0]}"
 
-        txt_win = self.font_xl.render(txt, True, ACCENT_COLOR)
-        self.screen.blit(
-            txt_win,
-            txt_win.get_rect(center=(SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2 - 50)),
+        W, H = SCREEN_SIZE
+        self._text(self.font_xl, txt, ACCENT_COLOR, center=(W // 2, H // 2 - 50))
+        self._text(
+            self.font_l,
+            "Press ESC to Exit or ENTER to play again",
+            TEXT_COLOR,
+            center=(W // 2, H // 2 + 50),
         )
 
-        txt_sub = self.font_l.render(
-            "Press ESC to Exit or ENTER to play again", True, TEXT_COLOR
-        )
-        self.screen.blit(
-            txt_sub,
-            txt_sub.get_rect(center=(SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2 + 50)),
+    def _frame_key(self):
+        """Everything that can change on screen; frames with an unchanged key are skipped."""
+        thinking = self.state == "CALCULATE" and pygame.time.get_ticks() // THINK_DOT_MS
+        return (
+            self.state,
+            self.round_idx,
+            self.anim_progress,
+            tuple(self.current_allocations),
+            thinking,
         )
 
     def run(self):
-        while True:
+        """
+        Event-driven main loop: input, state updates and drawing all happen
+        once per tick, and nothing in it blocks, so the frame clock stays
+        steady while opponents think or the game waits for a key.
+        """
+        dt = 0.0
+        last_frame = None
+        while self.running:
             self.handle_input()
             if self.state != "END":
-                self.update()
-
-            self.screen.fill(BG_COLOR)
-
-            self.draw_battlefields()
-            self.draw_hud()
-            self.draw_troops_anim()
-            self.draw_results_static()
-
-            if self.state == "END":
-                self.draw_game_over()
-                # keys = pygame.key.get_pressed()
-                pygame.display.update()
-                pygame.event.clear()
-
-                while True:
-                    event = pygame.event.wait()
-                    if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
-                        self.reset()
-                        break
-                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                        pygame.quit()
-                        return
+                self.update(dt)
+
+            frame = self._frame_key()
+            if frame != last_frame or self.full_redraw:
+                last_frame = frame
+                self.begin_frame()
+                self.draw_battlefields()
+                self.draw_hud()
+                self.draw_troops_anim()
+                self.draw_results_static()
+                self.draw_thinking()
 
-            elif self.state == "NEXT_ROUND":
-                txt = self.font_m.render("Press ENTER to continue.", True, TEXT_COLOR)
                 W, H = SCREEN_SIZE
-                self.screen.blit(txt, txt.get_rect(center=(W // 2, H - 100)))
-                pygame.display.update()
-                pygame.event.clear()
+                if self.state == "END":
+                    self.draw_game_over()
+                elif self.state == "NEXT_ROUND":
+                    self._text(self.font_m, "Press ENTER to continue.", TEXT_COLOR, center=(W // 2, H - 100))
+                self.end_frame()
 
-                while True:
-                    event = pygame.event.wait()
-                    if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
-                        break
+            dt = self.clock.tick(FPS) / 1000
 
-            pygame.display.flip()
-            self.clock.tick(FPS)
+        self.referee.close()
+        pygame.quit()
 
 
 class HumanPlaceholder(AbstractAgent):
+    """Plays the allocation the UI stored in `move` before the round was resolved."""
+
+    move = []
+
     def get_allocation(self, *args, **kwargs):
-        return []
+        return self.move
 
 
 if __name__ == "__main__":
@@ -457,11 +576,13 @@ if __name__ == "__main__":
         num_fields = config["human_play"]["num_fields"]
         rounds = config["human_play"]["rounds"]
         start_balance = config["human_play"]["start_balance"]
+        move_timeout = config["human_play"].get("move_timeout", MOVE_TIMEOUT)
     except Exception as e:
         print("Config not found or invalid, using defaults.")
         num_fields = 5
         rounds = 5
         start_balance = 100
+        move_timeout = MOVE_TIMEOUT
 
     # Setup Env and Agents
     field_values = [np.random.randint(2, 10) for _ in range(num_fields)]
@@ -490,5 +611,5 @@ if __name__ == "__main__":
     # To - Do: check final winner calculations
     # update selecte agent function
 
-    game = InteractiveGame(env, human, opponents)
+    game = InteractiveGame(env, human, opponents, move_timeout)
     game.run()
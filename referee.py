@@ -0,0 +1,150 @@
+import time
+import queue
+import threading
+import numpy as np
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FuturesTimeout
+
+
+class MoveTimeout(Exception):
+    """Raised when an agent does not return a move within its budget."""
+
+
+class _AgentThread:
+    """
+    Long-lived daemon thread that runs one agent's moves. Unlike a
+    ThreadPoolExecutor worker it is not joined at exit, so a hung agent
+    cannot keep the tournament process alive.
+    """
+
+    def __init__(self, name):
+        self._queue = queue.SimpleQueue()
+        threading.Thread(target=self._run, name=f"agent-{name}", daemon=True).start()
+
+    def submit(self, fn, *args):
+        future = Future()
+        self._queue.put((future, fn, args))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self):
+        self._queue.put(None)
+
+
+class Referee:
+    """
+    Calls agents under a per-move and per-game time budget.
+    Every agent gets one long-lived worker thread, so a move costs a queue
+    hand-off rather than a process spawn. A thread cannot be killed: an agent
+    that overruns forfeits the rest of the game, and whatever its call
+    returns late is discarded. It still shares the process with the other
+    agents until it returns, so only sandboxed agents (agent_pool.py) are
+    fully isolated from it.
+
+    move_timeout / game_timeout: wall-clock seconds (None = unlimited)
+    cpu_timeout: CPU seconds per game spent inside get_allocation (None = unlimited)
+    """
+
+    def __init__(self, move_timeout=None, game_timeout=None, cpu_timeout=None):
+        self.move_timeout = move_timeout
+        self.game_timeout = game_timeout
+        self.cpu_timeout = cpu_timeout
+        self._threads = {}
+        self._pending = {}
+        self.new_game()
+
+    def new_game(self):
+        """Resets per-game budgets and latency records."""
+        self.wall_used = {}
+        self.cpu_used = {}
+        # Seconds per move of the current game, per agent
+        self.move_times = {}
+        # Agents that timed out this game
+        self.forfeited = set()
+
+    def _thread(self, name):
+        if name not in self._threads:
+            self._threads[name] = _AgentThread(name)
+        return self._threads[name]
+
+    @staticmethod
+    def _timed(fn, args, kwargs):
+        start = time.thread_time()
+        move = fn(*args, **kwargs)
+        return move, time.thread_time() - start
+
+    def call(self, agent, *args, **kwargs):
+        """Returns agent.get_allocation(*args, **kwargs) or raises MoveTimeout."""
+        name = agent.name
+        wall_used = self.wall_used.get(name, 0.0)
+        cpu_used = self.cpu_used.get(name, 0.0)
+
+        if name in self.forfeited:
+            raise MoveTimeout(f"{name} forfeited the game after a timeout")
+        pending = self._pending.get(name)
+        if pending is not None and not pending.done():
+            raise MoveTimeout(f"{name} is still busy with an earlier move")
+        if self.game_timeout is not None and wall_used >= self.game_timeout:
+            raise MoveTimeout(f"{name} used up its {self.game_timeout}s game budget")
+        if self.cpu_timeout is not None and cpu_used >= self.cpu_timeout:
+            raise MoveTimeout(f"{name} used up its {self.cpu_timeout}s CPU budget")
+
+        limits = [self.move_timeout]
+        if self.game_timeout is not None:
+            limits.append(self.game_timeout - wall_used)
+        limits = [t for t in limits if t is not None]
+        timeout = min(limits) if limits else None
+
+        start = time.perf_counter()
+        future = self._thread(name).submit(self._timed, agent.get_allocation, args, kwargs)
+        self._pending[name] = future
+        try:
+            move, cpu = future.result(timeout=timeout)
+        except FuturesTimeout:
+            self.forfeited.add(name)
+            raise MoveTimeout(f"{name} timed out after {timeout:.2f}s") from None
+        finally:
+            elapsed = time.perf_counter() - start
+            self.wall_used[name] = wall_used + elapsed
+            self.move_times.setdefault(name, []).append(elapsed)
+
+        self.cpu_used[name] = cpu_used + cpu
+        return move
+
+    def close(self):
+        for thread in self._threads.values():
+            thread.shutdown()
+        self._threads = {}
+
+
+def latency_stats(move_times):
+    """{name: [seconds]} -> {name: {"p50", "p95", "max"}} in seconds."""
+    stats = {}
+    for name, times in move_times.items():
+        if not times:
+            continue
+        p50, p95 = np.percentile(times, [50, 95])
+        stats[name] = {"p50": float(p50), "p95": float(p95), "max": float(max(times))}
+    return stats
+
+
+def referee_from_config(config):
+    """Builds a Referee from the optional [referee] section of config.toml."""
+    section = config.get("referee", {})
+    return Referee(
+        section.get("move_timeout"),
+        section.get("game_timeout"),
+        section.get("cpu_timeout"),
+    )
@@ -0,0 +1,233 @@
+import zlib
+import random
+import threading
+import numpy as np
+from env import Env
+
+REPLAY_VERSION = 1
+# Held while a _SeededAgent swaps the global RNG states in or out
+_RNG_LOCK = threading.Lock()
+
+
+class SeedTree:
+    """
+    Master seed -> per-game seed -> per-agent seed.
+    Agent streams are keyed by agent name, so adding or removing an agent
+    from a line-up does not change what the others draw.
+    """
+
+    def __init__(self, master_seed=None):
+        self.root = np.random.SeedSequence(master_seed)
+
+    @property
+    def master_seed(self):
+        return self.root.entropy
+
+    def games(self, num_games):
+        return self.root.spawn(num_games)
+
+
+def field_rng(game_seed):
+    """Generator used to draw a game's field values."""
+    return np.random.default_rng(game_seed)
+
+
+def agent_seed(game_seed, name):
+    """32-bit seed of one agent's private stream in one game."""
+    key = game_seed.spawn_key + (zlib.crc32(name.encode()),)
+    seq = np.random.SeedSequence(game_seed.entropy, spawn_key=key)
+    return int(seq.generate_state(1)[0])
+
+
+class _SeededAgent:
+    """
+    Wraps an in-process agent so every get_allocation call runs with that
+    agent's own `random` and `np.random` global state swapped in.
+    Each swap is atomic, but an agent the referee gave up on still draws from
+    the global RNGs until its call returns. Games with a timeout therefore
+    only replay bit-for-bit with --sandbox.
+    """
+
+    def __init__(self, agent, seed):
+        self.agent = agent
+        self.name = agent.name
+        self._py_state = random.Random(seed).getstate()
+        self._np_state = np.random.RandomState(seed).get_state()
+
+    def __getattr__(self, attr):
+        return getattr(self.agent, attr)
+
+    def get_allocation(self, *args, **kwargs):
+        with _RNG_LOCK:
+            py_saved, np_saved = random.getstate(), np.random.get_state()
+            random.setstate(self._py_state)
+            np.random.set_state(self._np_state)
+        try:
+            return self.agent.get_allocation(*args, **kwargs)
+        finally:
+            with _RNG_LOCK:
+                self._py_state, self._np_state = random.getstate(), np.random.get_state()
+                random.setstate(py_saved)
+                np.random.set_state(np_saved)
+
+
+def seed_agents(agents, game_seed):
+    """
+    Gives each agent its private RNG stream for one game and returns the agents
+    to play with plus {name: seed}. Sandboxed agents reseed their own process.
+    """
+    seeds = {a.name: agent_seed(game_seed, a.name) for a in agents}
+    seeded = []
+    for a in agents:
+        if hasattr(a, "reseed"):
+            a.reseed(seeds[a.name])
+            seeded.append(a)
+        else:
+            seeded.append(_SeededAgent(a, seeds[a.name]))
+    return seeded, seeds
+
+
+class Replay:
+    """Everything needed to reproduce one game bit-for-bit."""
+
+    def __init__(
+        self,
+        agent_names,
+        field_values,
+        allocations,
+        starting_soldiers,
+        total_rounds,
+        agent_seeds=None,
+        game_seed=None,
+    ):
+        self.agent_names = list(agent_names)
+        self.field_values = list(field_values)
+        # (rounds_played, num_agents, num_fields)
+        self.allocations = np.asarray(allocations)
+        self.starting_soldiers = starting_soldiers
+        self.total_rounds = total_rounds
+        self.agent_seeds = agent_seeds or {}
+        self.game_seed = game_seed
+
+    @classmethod
+    def from_env(cls, env, agent_seeds=None, game_seed=None):
+        return cls(
+            env.agent_names,
+            env.field_values,
+            env.history.array.copy(),
+            env.starting_soldiers,
+            env.total_rounds,
+            agent_seeds,
+            game_seed,
+        )
+
+    def save(self, path):
+        """Writes the replay as a compressed .npz file."""
+        seed = self.game_seed
+        np.savez_compressed(
+            path,
+            version=REPLAY_VERSION,
+            agent_names=np.array(self.agent_names),
+            field_values=np.array(self.field_values, dtype=np.int64),
+            allocations=self.allocations,
+            starting_soldiers=self.starting_soldiers,
+            total_rounds=self.total_rounds,
+            agent_seeds=np.array(
+                [self.agent_seeds.get(n, -1) for n in self.agent_names], np.int64
+            ),
+            # Entropy may exceed 64 bits, so it is stored as text
+            seed_entropy=np.array("" if seed is None else str(seed.entropy)),
+            seed_spawn_key=np.array([] if seed is None else seed.spawn_key, np.int64),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            names = data["agent_names"].tolist()
+            seeds = dict(zip(names, data["agent_seeds"].tolist()))
+            game_seed = None
+            if str(data["seed_entropy"]):
+                game_seed = np.random.SeedSequence(
+                    int(str(data["seed_entropy"])),
+                    spawn_key=tuple(data["seed_spawn_key"].tolist()),
+                )
+            return cls(
+                names,
+                data["field_values"].tolist(),
+                data["allocations"],
+                int(data["starting_soldiers"]),
+                int(data["total_rounds"]),
+                {n: s for n, s in seeds.items() if s >= 0},
+                game_seed,
+            )
+
+    def env(self, until=None):
+        """A fresh Env fast-forwarded to round `until` (default: the end)."""
+        env = Env(
+            self.agent_names,
+            self.field_values,
+            num_fields=len(self.field_values),
+            total_rounds=self.total_rounds,
+            starting_soldiers=self.starting_soldiers,
+        )
+        env.fast_forward(self.allocations, until)
+        return env
+
+
+def first_divergence(replay, recorded):
+    """
+    Compares a re-run game (a Replay) against a recorded one and returns the
+    first round (1-based) whose allocations differ, or None if identical.
+    """
+    for r, (a, b) in enumerate(zip(replay.allocations, recorded.allocations), start=1):
+        if not np.array_equal(a, b):
+            return r
+    if len(replay.allocations) != len(recorded.allocations):
+        return min(len(replay.allocations), len(recorded.allocations)) + 1
+    return None
+
+
+if __name__ == "__main__":
+    import argparse
+    from run_tournament import load_agents, play_game
+
+    parser = argparse.ArgumentParser(description="Inspect or verify a game replay.")
+    parser.add_argument("path", help="replay .npz file")
+    parser.add_argument("--round", type=int, default=None, help="fast-forward to this round")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="re-run the agents with the recorded seeds and report the first divergent round",
+    )
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    state = replay.env(args.round).get_state()
+    print(f"Field values: {replay.field_values}")
+    print(f"Round {state['current_round']} / {replay.total_rounds}")
+    print(f"Scores: {state['scores']}")
+    print(f"Balances: {state['balances']}")
+
+    if args.verify:
+        by_name = {a.name: a for a in load_agents()}
+        agents = [by_name[n] for n in replay.agent_names]
+        seeded = [_SeededAgent(a, replay.agent_seeds[a.name]) for a in agents]
+        rerun = play_game(
+            seeded,
+            replay.field_values,
+            verbose=False,
+            total_rounds=replay.total_rounds,
+            starting_soldiers=replay.starting_soldiers,
+        )
+        rerun = Replay(
+            replay.agent_names,
+            replay.field_values,
+            rerun["history"].array,
+            replay.starting_soldiers,
+            replay.total_rounds,
+        )
+        diverged = first_divergence(rerun, replay)
+        if diverged is None:
+            print("Replay verified: re-run is identical.")
+        else:
+            print(f"Re-run diverges at round {diverged}.")
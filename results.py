@@ -0,0 +1,152 @@
+import os
+import json
+import numpy as np
+from env import resolve_fields
+
+# One row per (game, round, agent, field)
+COLUMNS = {
+    "game": np.int64,
+    "round": np.int32,
+    "agent": np.int32,
+    "field": np.int32,
+    "allocation": np.int32,
+    "win": np.bool_,
+    "score_delta": np.int32,
+}
+SCHEMA_FILE = "schema.json"
+
+
+class ResultWriter:
+    """
+    Append-only columnar store for tournament outcomes.
+    Every column is a flat binary file in `directory`, written in chunks of
+    chunk_rows rows, so a run never holds more than one chunk in memory.
+    schema.json records dtypes, the row count and the agent-id -> name table.
+    Opening an existing store appends to it; `games` is the next unused game id.
+    """
+
+    def __init__(self, directory, chunk_rows=1_000_000):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        os.makedirs(directory, exist_ok=True)
+
+        schema_path = os.path.join(directory, SCHEMA_FILE)
+        if os.path.exists(schema_path):
+            with open(schema_path) as f:
+                schema = json.load(f)
+            self.agents = schema["agents"]
+            self.rows = schema["rows"]
+        else:
+            self.agents = []
+            self.rows = 0
+        # Drop rows from an interrupted flush that never made it into the schema
+        for c, dtype in COLUMNS.items():
+            path = os.path.join(directory, f"{c}.bin")
+            if os.path.exists(path):
+                os.truncate(path, self.rows * np.dtype(dtype).itemsize)
+        self.games = 0
+        if self.rows:
+            last = np.memmap(
+                os.path.join(directory, "game.bin"), COLUMNS["game"], mode="r", shape=(self.rows,)
+            )
+            self.games = int(last[-1]) + 1
+        self._agent_ids = {name: i for i, name in enumerate(self.agents)}
+        self._buffers = {c: np.empty(chunk_rows, dtype) for c, dtype in COLUMNS.items()}
+        self._filled = 0
+
+    def agent_id(self, name):
+        if name not in self._agent_ids:
+            self._agent_ids[name] = len(self.agents)
+            self.agents.append(name)
+        return self._agent_ids[name]
+
+    def add_game(self, game, agent_names, field_values, allocations):
+        """
+        Appends every (round, agent, field) row of one finished game.
+        allocations: (rounds, num_agents, num_fields) as recorded by Env.
+        """
+        allocations = np.asarray(allocations)
+        rounds, num_agents, num_fields = allocations.shape
+        winners, _ = resolve_fields(allocations, np.asarray(field_values, np.int64))
+        ids = np.array([self.agent_id(n) for n in agent_names], np.int32)
+        self.games = max(self.games, game + 1)
+
+        # (rounds, agents, fields) grids, flattened in C order
+        r_idx, a_idx, f_idx = np.indices(allocations.shape)
+        win = winners[:, None, :] == a_idx
+        columns = {
+            "game": np.full(allocations.size, game),
+            "round": r_idx.ravel() + 1,
+            "agent": ids[a_idx.ravel()],
+            "field": f_idx.ravel(),
+            "allocation": allocations.ravel(),
+            "win": win.ravel(),
+            "score_delta": (win * np.asarray(field_values)[f_idx]).ravel(),
+        }
+        self._append(columns, allocations.size)
+
+    def _append(self, columns, n):
+        start = 0
+        while start < n:
+            take = min(n - start, self.chunk_rows - self._filled)
+            for c, buf in self._buffers.items():
+                buf[self._filled : self._filled + take] = columns[c][start : start + take]
+            self._filled += take
+            start += take
+            if self._filled == self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        """Writes the buffered chunk to the column files and updates the schema."""
+        for c, buf in self._buffers.items():
+            with open(os.path.join(self.directory, f"{c}.bin"), "ab") as f:
+                buf[: self._filled].tofile(f)
+        self.rows += self._filled
+        self._filled = 0
+        schema = {
+            "columns": {c: np.dtype(d).str for c, d in COLUMNS.items()},
+            "rows": self.rows,
+            "agents": self.agents,
+        }
+        with open(os.path.join(self.directory, SCHEMA_FILE), "w") as f:
+            json.dump(schema, f)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_results(directory):
+    """
+    Memory-maps a result store. Returns ({column: read-only array}, agent names).
+    Only rows covered by the schema are exposed, so a store that is still
+    being written can be read safely.
+    """
+    with open(os.path.join(directory, SCHEMA_FILE)) as f:
+        schema = json.load(f)
+    columns = {}
+    for c, dtype in schema["columns"].items():
+        path = os.path.join(directory, f"{c}.bin")
+        if schema["rows"] == 0:
+            columns[c] = np.empty(0, np.dtype(dtype))
+            continue
+        columns[c] = np.memmap(path, np.dtype(dtype), mode="r", shape=(schema["rows"],))
+    return columns, schema["agents"]
+
+
+def to_pandas(directory):
+    """Loads a result store as a pandas DataFrame with agent names filled in."""
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("to_pandas requires pandas; use load_results for NumPy arrays")
+
+    columns, agents = load_results(directory)
+    df = pd.DataFrame(columns)
+    df["agent"] = pd.Categorical.from_codes(df["agent"], categories=agents)
+    return df
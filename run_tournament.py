@@ -1,7 +1,21 @@
 import os
-import importlib.util
+import argparse
 import numpy as np
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
 from env import Env
+from agent_pool import AgentPool
+from agent_loader import (
+    IMPORT_TIMEOUT,
+    LazyAgent,
+    defines_class,
+    ensure_imported,
+    print_import_times,
+)
+from replay import Replay, SeedTree, field_rng, seed_agents
+from results import ResultWriter
+from events import ThreadedSink, play_round, play_rounds
+from referee import latency_stats, referee_from_config
 import tomllib
 import sys
 
@@ -10,40 +24,36 @@ with open("config.toml", "rb") as f:
 
 
 def load_agents(folder_path="Sample_Agents", class_name="Agent"):
-    """Dynamically loads all Agent classes from the Agents folder."""
+    """
+    All agents in the Agents folder plus the player's agent, as LazyAgents:
+    a module is only imported when its agent first plays. Bytecode goes to
+    [tournament] bytecode_cache in config.toml if set.
+    """
+    cache_dir = config.get("tournament", {}).get("bytecode_cache")
     agents = []
-    paths = [folder_path]
-    for f_path in paths:
-        for filename in os.listdir(f_path):
-            if filename.endswith(".py") and filename != "__init__.py":
-                module_name = filename[:-3]
-                module_path = f"{folder_path}.{module_name}"
-                module = importlib.import_module(module_path)
-
-                # Create an instance of the 'Agent' class inside the module
-                if hasattr(module, "Agent"):
-                    # We use the filename (without .py) as the unique agent name
-                    agent_class = getattr(module, class_name)
-                    agent_instance = agent_class(name=module_name)
-                    agents.append(agent_instance)
-    name = config["player"]["NAME"]
-    spec = importlib.util.spec_from_file_location(
-        name, os.path.join(name, "your_agent.py")
-    )
-    module = importlib.util.module_from_spec(spec)
-    # sys.path.append(name)
-    spec.loader.exec_module(module)
+    for name, path in agent_files(folder_path, class_name):
+        # Sample agents are named after their file, the player's module after its folder
+        module_name = config["player"]["NAME"] if name == "Your Agent" else name
+        agents.append(LazyAgent(name, path, module_name, class_name, cache_dir))
+    return agents
 
-    # Create an instance of the 'Agent' class inside the module
-    if hasattr(module, "Agent"):
-        # We use the filename (without .py) as the unique agent name
-        agent_instance = module.Agent(name="Your Agent")
-        agents.append(agent_instance)
 
-    return agents
+def agent_files(folder_path="Sample_Agents", class_name="Agent"):
+    """
+    (agent name, file path) pairs, named and ordered the way load_agents names
+    them. Files that define no class_name (helper modules) are left out.
+    """
+    files = [
+        (filename[:-3], os.path.join(folder_path, filename))
+        for filename in os.listdir(folder_path)
+        if filename.endswith(".py") and filename != "__init__.py"
+    ]
+    name = config["player"]["NAME"]
+    files.append(("Your Agent", os.path.join(name, "your_agent.py")))
+    return [(n, path) for n, path in files if defines_class(path, class_name)]
 
 
-def validate_allocation(allocation, n, t, name):
+def validate_allocation(allocation, n, t, name, verbose=True):
     """
     Validates the allocation list based on:
     1. Length must be exactly N.
@@ -71,12 +81,14 @@ def validate_allocation(allocation, n, t, name):
         is_positive = np.all(arr >= 0)
 
         if not (is_integer_type and is_positive):
-            print(f"Invalid move from {name}. Disqualifying round.")
+            if verbose:
+                print(f"Invalid move from {name}. Disqualifying round.")
             return fallback
 
         # 3. Check if sum is smaller than T
         if np.sum(arr) > t:
-            print(f"Invalid move from {name}. Disqualifying round.")
+            if verbose:
+                print(f"Invalid move from {name}. Disqualifying round.")
             return fallback
 
         # Return as a standard list of integers
@@ -84,85 +96,108 @@ def validate_allocation(allocation, n, t, name):
 
     except Exception as e:
         # Catch-all for unexpected data types within the list (e.g., strings)
-        print(f"Invalid move from {name}. Disqualifying round.")
+        if verbose:
+            print(f"Invalid move from {name}. Disqualifying round.")
         return fallback
 
 
-def run_round_logic(env, agents):
-    """Referees the round: Gets moves, validates them, and calls env.step."""
-    current_state = env.get_state()
-    round_allocations = {}
-    field_allocations = [[] for i in range(env.num_fields)]
-    # print(field_allocations)
-
-    for agent in agents:
-        # Get raw move from participant code
-        try:
-            move = agent.get_allocation(
-                current_state["balances"][agent.name],
-                env.field_values,
-                env.num_fields,
-                current_state["history"],
-                current_state["balances"],
-                env.total_rounds,
-                current_state["current_round"] + 1,
-            )
-            move = validate_allocation(
-                move, env.num_fields, current_state["balances"][agent.name], agent.name
-            )
-            move = np.array(move)
-        except Exception as e:
-            print(f"Agent {agent.name} crashed: {e}")
-            move = np.zeros(env.num_fields)
+def run_round_logic(env, agents, verbose=True, referee=None):
+    """
+    Referees the round (see events.play_round) and returns
+    (state, winners, per-field allocations).
+    """
+    event = play_round(env, agents, verbose, referee)
+    return env.get_state(), event.winners, event.allocations.T.tolist()
 
-        round_allocations[agent.name] = move.tolist()
-        for n in range(env.num_fields):
-            field_allocations[n].append(int(move[n]))
 
-    state, winners = env.step(round_allocations)
-    return state, winners, field_allocations
+def print_round(event, field_values):
+    """CLI view of one round."""
+    print(f"ROUND {event.round} RESULTS:")
+    field_allocations = event.allocations.T.tolist()
+    for i, w in enumerate(event.winners):
+        print(
+            f"  Field {i} (Val {field_values[i]}): Winner -> {event.agent_names[w] if w >= 0 else 'Tie'}  Allocations: {field_allocations[i]}"
+        )
 
+    print(f"Scores: {event.scores}")
+    print(f"Balances: {event.balances}")
+    print("-" * 30)
 
-def start_tournament():
-    # Setup
-    num_fields = config["env"]["num_fields"]
-    rounds = config["env"]["rounds"]
-    start_balance = config["env"]["start_balance"]
-    field_values = [np.random.randint(2, 10) for _ in range(num_fields)]
-    agents = load_agents()
-    agent_names = [a.name for a in agents]
 
+def play_game(
+    agents,
+    field_values,
+    verbose=True,
+    referee=None,
+    total_rounds=None,
+    starting_soldiers=None,
+):
+    """
+    Plays one full game between agents and returns the final state.
+    In verbose mode every round is printed as it is resolved.
+    total_rounds / starting_soldiers default to the [env] settings in config.toml.
+    """
+    agent_names = [a.name for a in agents]
     env = Env(
         agent_names,
         field_values,
-        num_fields=num_fields,
-        total_rounds=rounds,
-        starting_soldiers=start_balance,
+        num_fields=len(field_values),
+        total_rounds=config["env"]["rounds"] if total_rounds is None else total_rounds,
+        starting_soldiers=(
+            config["env"]["start_balance"] if starting_soldiers is None else starting_soldiers
+        ),
     )
+    if referee is not None:
+        referee.new_game()
+    # Import time is not part of any agent's move budget
+    ensure_imported(agents, config.get("referee", {}).get("import_timeout", IMPORT_TIMEOUT))
+
+    for event in play_rounds(env, agents, verbose, referee):
+        if verbose:
+            print_round(event, field_values)
+            print("Press ENTER to continue.....")
+            input()
+
+    return env.get_state()
+
+
+def game_winners(scores):
+    """Names of the agents sharing the top score."""
+    max_score = max(scores.values())
+    return [k for k in scores.keys() if scores.get(k) == max_score]
+
+
+def start_tournament(seed=None, replay_dir=None):
+    """
+    Plays one game round by round. Field values and agent streams come from
+    the master seed (printed at the start), so the game can be replayed.
+    """
+    # Setup
+    num_fields = config["env"]["num_fields"]
+    tree = SeedTree(seed)
+    game_seed = tree.games(1)[0]
+    field_values = field_rng(game_seed).integers(2, 10, size=num_fields).tolist()
+    agents = load_agents()
+    agent_names = [a.name for a in agents]
+    seeded, agent_seeds = seed_agents(agents, game_seed)
 
     print("--- Tournament Start ---")
+    print(f"Master seed: {tree.master_seed}")
     print(f"Fields: {num_fields} | Values: {field_values}")
     print(f"Participants: {', '.join(agent_names)}\n")
 
-    for r in range(1, env.total_rounds + 1):
-        state, winners, field_allocations = run_round_logic(env, agents)
-
-        print(f"ROUND {r} RESULTS:")
-        for i, w in enumerate(winners):
-            print(
-                f"  Field {i} (Val {field_values[i]}): Winner -> {agent_names[w] if w >= 0 else 'Tie'}  Allocations: {field_allocations[i]}"
-            )
-
-        print(f"Scores: {state['scores']}")
-        print(f"Balances: {state['balances']}")
-        print("-" * 30)
-        print("Press ENTER to continue.....")
-        input()
+    referee = referee_from_config(config)
+    try:
+        state = play_game(seeded, field_values, referee=referee)
+    finally:
+        referee.close()
+    if replay_dir is not None:
+        os.makedirs(replay_dir, exist_ok=True)
+        save_replay(replay_dir, agent_names, field_values, state, agent_seeds, game_seed)
 
     # Final Result
     # state["scores"] = {"random_agent": 51, "uniform_agent": 122, "Your Agent": 122}
-    max_score = max(state["scores"].values())
-    winners = [k for k in state["scores"].keys() if state["scores"].get(k) == max_score]
+    winners = game_winners(state["scores"])
     if len(winners) > 1:
         print(
             f"\n TOURNAMENT OVER. RESULT: Tie between {','.join(winners[:-1])} and {winners[-1]}"
@@ -174,5 +209,267 @@ def start_tournament():
         sys.path.remove(config["player"]["NAME"])
 
 
+def save_replay(replay_dir, agent_names, field_values, state, agent_seeds, seed):
+    """Saves a finished game as a replay named after its index in the seed tree."""
+    replay = Replay(
+        agent_names,
+        field_values,
+        state["history"].array,
+        config["env"]["start_balance"],
+        config["env"]["rounds"],
+        agent_seeds,
+        seed,
+    )
+    replay.save(os.path.join(replay_dir, f"game_{seed.spawn_key[-1]:06d}.npz"))
+
+
+def summarize(results, agent_names):
+    """
+    Aggregates finished games into per-agent statistics.
+    results: list of {"scores", "balances"} dicts, one per game. Agents that
+    sat out a game (different line-ups) are only averaged over games they played.
+    """
+    summary = {}
+    for name in agent_names:
+        played = [r for r in results if name in r["scores"]]
+        if not played:
+            continue
+        scores = np.array([r["scores"][name] for r in played])
+        leftover = np.array([r["balances"][name] for r in played])
+        wins = sum(game_winners(r["scores"]) == [name] for r in played)
+        summary[name] = {
+            "win_rate": wins / len(played),
+            "mean_score": float(scores.mean()),
+            "std_score": float(scores.std()),
+            "mean_leftover": float(leftover.mean()),
+        }
+    return summary
+
+
+def print_summary(summary, num_games):
+    print(f"--- Summary over {num_games} games ---")
+    header = f"{'Agent':<20} | {'Win %':>6} | {'Score (mean ± std)':>20} | {'Leftover':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, s in sorted(summary.items(), key=lambda x: -x[1]["win_rate"]):
+        score = f"{s['mean_score']:.1f} ± {s['std_score']:.1f}"
+        print(
+            f"{name:<20} | {100 * s['win_rate']:>6.1f} | {score:>20} | {s['mean_leftover']:>8.1f}"
+        )
+
+
+def print_latency(results):
+    """Per-agent move latency over all games, in milliseconds."""
+    move_times = {}
+    for r in results:
+        for name, times in r["move_times"].items():
+            move_times.setdefault(name, []).extend(times)
+    header = f"{'Agent':<20} | {'p50 ms':>8} | {'p95 ms':>8} | {'max ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, s in latency_stats(move_times).items():
+        print(
+            f"{name:<20} | {1e3 * s['p50']:>8.3f} | {1e3 * s['p95']:>8.3f} | {1e3 * s['max']:>8.3f}"
+        )
+
+
+# Agents (and their referee threads) loaded once per worker process
+# and reused for every game it plays
+_worker_agents = None
+_worker_referee = None
+# Agents whose import time this worker has already reported
+_worker_imported = set()
+
+
+def _init_worker(sandbox=False):
+    """
+    With sandbox, every agent runs in its own persistent process (agent_pool)
+    that is killed and restarted if it hangs past move_timeout or crashes.
+    """
+    global _worker_agents, _worker_referee
+    _worker_imported.clear()
+    if sandbox:
+        section = config.get("referee", {})
+        pool = AgentPool(
+            agent_files(),
+            section.get("move_timeout"),
+            section.get("memory_limit_mb"),
+            config.get("tournament", {}).get("bytecode_cache"),
+        )
+        agents = pool.agents
+    else:
+        agents = load_agents()
+    _worker_agents = {a.name: a for a in agents}
+    _worker_referee = referee_from_config(config)
+
+
+def _play_seeded_game(seed, lineup=None, replay_dir=None):
+    """
+    Plays one game in the current worker. Field values and each agent's private
+    `random` / `np.random` streams are derived from seed, so the outcome does not
+    depend on which worker ran the game. With replay_dir the game is saved as
+    a replay named after its index.
+    """
+    rng = field_rng(seed)
+    field_values = rng.integers(2, 10, size=config["env"]["num_fields"]).tolist()
+
+    names = lineup if lineup is not None else list(_worker_agents)
+    agents, agent_seeds = seed_agents([_worker_agents[n] for n in names], seed)
+    state = play_game(agents, field_values, verbose=False, referee=_worker_referee)
+    if replay_dir is not None:
+        save_replay(replay_dir, names, field_values, state, agent_seeds, seed)
+    return {
+        "field_values": field_values,
+        "scores": state["scores"],
+        "balances": state["balances"],
+        "move_times": _worker_referee.move_times,
+        "allocations": state["history"].array,
+        "import_times": _new_import_times(),
+    }
+
+
+def _new_import_times():
+    """Import seconds of the worker's agents imported since the last call."""
+    times = {}
+    for name, agent in _worker_agents.items():
+        seconds = getattr(agent, "import_time", None)
+        if seconds is not None and name not in _worker_imported:
+            times[name] = seconds
+            _worker_imported.add(name)
+    return times
+
+
+def run_headless(
+    num_games,
+    workers=1,
+    seed=None,
+    lineups=None,
+    sandbox=False,
+    replay_dir=None,
+    results_dir=None,
+    import_times=False,
+):
+    """
+    Plays num_games games without prompts and prints a summary.
+    With workers > 1 games are spread over a process pool; every game gets its
+    own child seed, so results are identical for any number of workers.
+    lineups: optional list of agent-name lists, one per game.
+    sandbox: run every agent in its own long-lived worker process.
+    replay_dir: save a replay of every game there.
+    results_dir: stream per-(game, round, agent, field) rows into a columnar
+    store there (see results.py).
+    import_times: also print each agent's slowest import across workers.
+    """
+    tree = SeedTree(seed)
+    seeds = tree.games(num_games)
+    lineups = lineups if lineups is not None else [None] * num_games
+    replay_dirs = [replay_dir] * num_games
+    if replay_dir is not None:
+        os.makedirs(replay_dir, exist_ok=True)
+
+    results = []
+    # Writer, store and pool are closed even if a game raises
+    with ExitStack() as stack:
+        # The writer encodes and flushes on its own thread, off the result loop
+        writer, first_game = None, 0
+        if results_dir is not None:
+            store = stack.enter_context(ResultWriter(results_dir))
+            writer = stack.enter_context(ThreadedSink(store.add_game))
+            # Games appended to an existing store continue its numbering
+            first_game = store.games
+        if workers > 1:
+            chunksize = max(1, num_games // (workers * 8))
+            pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(sandbox,))
+            stack.callback(pool.shutdown, cancel_futures=True)
+            # map yields in submission order, whatever order games finish in
+            games = pool.map(
+                _play_seeded_game, seeds, lineups, replay_dirs, chunksize=chunksize
+            )
+        else:
+            _init_worker(sandbox)
+            games = map(_play_seeded_game, seeds, lineups, replay_dirs)
+
+        for game_idx, result in enumerate(games, start=first_game):
+            allocations = result.pop("allocations")
+            if writer is not None:
+                writer(game_idx, list(result["scores"]), result["field_values"], allocations)
+            results.append(result)
+    agent_names = list(dict.fromkeys(n for r in results for n in r["scores"]))
+
+    print(f"Master seed: {tree.master_seed}")
+    print_summary(summarize(results, agent_names), num_games)
+    print_latency(results)
+    if import_times:
+        slowest = {}
+        for r in results:
+            for name, seconds in r["import_times"].items():
+                slowest[name] = max(seconds, slowest.get(name, 0.0))
+        print_import_times(slowest)
+    return results
+
+
+def parse_args():
+    tournament = config.get("tournament", {})
+    parser = argparse.ArgumentParser(description="Run a tournament between agents.")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        default=tournament.get("headless", False),
+        help="play without prompts and only print a summary",
+    )
+    parser.add_argument(
+        "--games",
+        type=int,
+        default=tournament.get("games", 1),
+        help="number of games to play in headless mode",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=tournament.get("workers", 1),
+        help="worker processes for headless mode",
+    )
+    parser.add_argument(
+        "--sandbox",
+        action="store_true",
+        default=config.get("referee", {}).get("sandbox", False),
+        help="run each agent in its own isolated worker process",
+    )
+    parser.add_argument(
+        "--replay-dir",
+        default=tournament.get("replay_dir"),
+        help="save a replay of every game in this directory",
+    )
+    parser.add_argument(
+        "--results-dir",
+        default=tournament.get("results_dir"),
+        help="stream headless results into a columnar store in this directory",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=tournament.get("seed"),
+        help="master seed (random if omitted)",
+    )
+    parser.add_argument(
+        "--import-times",
+        action="store_true",
+        help="report how long each agent took to import",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    start_tournament()
+    args = parse_args()
+    if args.headless:
+        run_headless(
+            args.games,
+            args.workers,
+            args.seed,
+            sandbox=args.sandbox,
+            replay_dir=args.replay_dir,
+            results_dir=args.results_dir,
+            import_times=args.import_times,
+        )
+    else:
+        start_tournament(args.seed, args.replay_dir)
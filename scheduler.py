@@ -0,0 +1,209 @@
+import math
+import argparse
+import itertools
+import numpy as np
+from run_tournament import config, load_agents, play_game
+
+Q = math.log(10) / 400
+
+
+class RatingTable:
+    """
+    Glicko-style ratings updated after every game.
+    Each agent has a rating and a rating deviation (RD); RD shrinks as the agent
+    plays, so it doubles as a convergence measure for the scheduler.
+    A k-player game counts as a head-to-head result between every pair of players.
+    """
+
+    def __init__(self, names, initial=1500.0, initial_rd=350.0, min_rd=30.0):
+        self.rating = {n: initial for n in names}
+        self.rd = {n: initial_rd for n in names}
+        self.games = {n: 0 for n in names}
+        self.min_rd = min_rd
+
+    @staticmethod
+    def _g(rd):
+        return 1 / math.sqrt(1 + 3 * (Q * rd) ** 2 / math.pi**2)
+
+    def expected(self, a, b):
+        """Expected head-to-head score of a against b."""
+        g = self._g(self.rd[b])
+        return 1 / (1 + 10 ** (-g * (self.rating[a] - self.rating[b]) / 400))
+
+    def update(self, scores):
+        """scores: {agent_name: final score} of one finished game."""
+        new_rating, new_rd = {}, {}
+        for a in scores:
+            var_inv, delta = 0.0, 0.0
+            for b in scores:
+                if b == a:
+                    continue
+                g = self._g(self.rd[b])
+                e = self.expected(a, b)
+                s = 0.5 if scores[a] == scores[b] else float(scores[a] > scores[b])
+                var_inv += Q**2 * g**2 * e * (1 - e)
+                delta += g * (s - e)
+            denom = 1 / self.rd[a] ** 2 + var_inv
+            new_rating[a] = self.rating[a] + Q / denom * delta
+            new_rd[a] = max(self.min_rd, math.sqrt(1 / denom))
+
+        # Apply simultaneously so the order of players in the game does not matter
+        self.rating.update(new_rating)
+        self.rd.update(new_rd)
+        for a in scores:
+            self.games[a] += 1
+
+    def converged(self, name, rd_threshold):
+        return self.rd[name] <= rd_threshold
+
+    def table(self):
+        """Rows of (name, rating, rd, games), best first."""
+        return sorted(
+            ((n, self.rating[n], self.rd[n], self.games[n]) for n in self.rating),
+            key=lambda row: -row[1],
+        )
+
+
+def round_robin(names, group_size=2):
+    """Every group of group_size agents exactly once."""
+    return itertools.combinations(names, group_size)
+
+
+def random_groups(names, group_size, rng):
+    """Endless stream of random k-player line-ups."""
+    names = list(names)
+    while True:
+        yield tuple(rng.choice(names, size=group_size, replace=False).tolist())
+
+
+def swiss_groups(ratings, group_size=2, played=()):
+    """
+    Groups agents with neighbouring ratings, preferring line-ups that have
+    not met before. When agents do not divide evenly into groups, the most
+    certain ones (lowest RD) sit the round out.
+    """
+    order = [row[0] for row in ratings.table()]
+    byes = sorted(order, key=lambda n: ratings.rd[n])[: len(order) % group_size]
+    order = [n for n in order if n not in byes]
+    groups = []
+    while len(order) >= group_size:
+        head = order.pop(0)
+        group = [head]
+        for cand in [c for c in order if frozenset((head, c)) not in played] + order:
+            if cand not in group:
+                group.append(cand)
+            if len(group) == group_size:
+                break
+        for member in group[1:]:
+            order.remove(member)
+        groups.append(tuple(group))
+    return groups
+
+
+def is_informative(group, ratings, rd_threshold):
+    """A line-up is worth playing while any of its members is still uncertain."""
+    return any(not ratings.converged(n, rd_threshold) for n in group)
+
+
+def play_groups(agents, groups, ratings, rng, games_per_match=1, rd_threshold=50.0):
+    """
+    Plays every informative group and feeds the results into ratings.
+    Returns the number of games actually played.
+    """
+    by_name = {a.name: a for a in agents}
+    num_fields = config["env"]["num_fields"]
+    played = 0
+    for group in groups:
+        if not is_informative(group, ratings, rd_threshold):
+            continue
+        for _ in range(games_per_match):
+            field_values = rng.integers(2, 10, size=num_fields).tolist()
+            state = play_game([by_name[n] for n in group], field_values, verbose=False)
+            ratings.update(state["scores"])
+            played += 1
+    return played
+
+
+def run_swiss(agents, rounds=20, group_size=2, seed=None, games_per_match=1, rd_threshold=50.0):
+    """
+    Swiss-style rating tournament: each round re-groups agents by current rating
+    and stops early once no informative line-ups are left.
+    """
+    rng = np.random.default_rng(seed)
+    ratings = RatingTable([a.name for a in agents])
+    met = set()
+    for _ in range(rounds):
+        groups = swiss_groups(ratings, group_size, met)
+        if not play_groups(agents, groups, ratings, rng, games_per_match, rd_threshold):
+            break
+        met.update(frozenset(pair) for g in groups for pair in itertools.combinations(g, 2))
+    return ratings
+
+
+def run_round_robin(agents, group_size=2, seed=None, games_per_match=1, rd_threshold=50.0):
+    """
+    Round-robin over all group_size line-ups in random order, skipping line-ups
+    whose members have all converged.
+    """
+    rng = np.random.default_rng(seed)
+    ratings = RatingTable([a.name for a in agents])
+    groups = list(round_robin([a.name for a in agents], group_size))
+    rng.shuffle(groups)
+    play_groups(agents, groups, ratings, rng, games_per_match, rd_threshold)
+    return ratings
+
+
+def run_random(agents, matches=100, group_size=2, seed=None, games_per_match=1, rd_threshold=50.0):
+    """
+    Random k-player line-ups: draws up to `matches` line-ups, skipping those
+    whose members have all converged, and stops once every agent has.
+    """
+    rng = np.random.default_rng(seed)
+    names = [a.name for a in agents]
+    ratings = RatingTable(names)
+    groups = itertools.islice(random_groups(names, group_size, rng), matches)
+    for group in groups:
+        if all(ratings.converged(n, rd_threshold) for n in names):
+            break
+        play_groups(agents, [group], ratings, rng, games_per_match, rd_threshold)
+    return ratings
+
+
+def print_ratings(ratings):
+    header = f"{'#':>3} | {'Agent':<20} | {'Rating':>7} | {'RD':>5} | {'Games':>5}"
+    print(header)
+    print("-" * len(header))
+    for i, (name, rating, rd, games) in enumerate(ratings.table(), start=1):
+        print(f"{i:>3} | {name:<20} | {rating:>7.1f} | {rd:>5.1f} | {games:>5}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank agents with a rating tournament.")
+    parser.add_argument("--mode", choices=["swiss", "round-robin", "random"], default="swiss")
+    parser.add_argument("--group-size", type=int, default=2, help="players per game")
+    parser.add_argument("--rounds", type=int, default=20, help="Swiss rounds")
+    parser.add_argument("--matches", type=int, default=100, help="line-ups drawn in random mode")
+    parser.add_argument("--games-per-match", type=int, default=1)
+    parser.add_argument(
+        "--rd-threshold",
+        type=float,
+        default=50.0,
+        help="stop scheduling agents whose rating deviation is below this",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    agents = load_agents()
+    if args.mode == "swiss":
+        ratings = run_swiss(
+            agents, args.rounds, args.group_size, args.seed, args.games_per_match, args.rd_threshold
+        )
+    elif args.mode == "random":
+        ratings = run_random(
+            agents, args.matches, args.group_size, args.seed, args.games_per_match, args.rd_threshold
+        )
+    else:
+        ratings = run_round_robin(
+            agents, args.group_size, args.seed, args.games_per_match, args.rd_threshold
+        )
+    print_ratings(ratings)
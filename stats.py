@@ -0,0 +1,174 @@
+import numpy as np
+
+# Weight of the newest round in the spend EWMAs
+EWMA_ALPHA = 0.3
+
+
+def stats_kwargs(agent, stats):
+    """Extra get_allocation keyword arguments for agents that opted in to stats."""
+    if stats is not None and getattr(agent, "wants_stats", False):
+        return {"stats": stats}
+    return {}
+
+
+def _read_only(arr):
+    view = arr.view()
+    view.flags.writeable = False
+    return view
+
+
+def _ratio(num, den):
+    return np.divide(num, den, out=np.zeros(np.shape(num)), where=den > 0)
+
+
+class FieldStats:
+    """
+    Running per-field aggregates of a game, updated in O(agents x fields) per
+    round so agents do not have to rescan the whole history every move.
+    All arrays are read-only views of the live statistics. Arrays may carry
+    leading batch axes (BatchEnv keeps one set per game); game(g) selects one.
+
+    Per field (num_fields,):
+        max        largest bid seen so far
+        last_max   largest bid of the last round
+        mean_max   mean over rounds of the largest bid
+        mean       mean bid over all agents and rounds
+        win_count  rounds the field had a winner
+        win_mean   mean winning bid
+        win_std    standard deviation of the winning bid
+    Per agent:
+        spend_ewma (num_agents,)              EWMA of total spend per round
+        alloc_ewma (num_agents, num_fields)   EWMA of each field's bid
+    """
+
+    def __init__(self, agent_names, num_fields, batch_shape=(), alpha=EWMA_ALPHA):
+        self.agent_names = list(agent_names)
+        self.agent_index = {name: i for i, name in enumerate(self.agent_names)}
+        self.num_fields = num_fields
+        self.alpha = alpha
+        self.rounds = 0
+
+        fields = tuple(batch_shape) + (num_fields,)
+        agents = tuple(batch_shape) + (len(self.agent_names),)
+        self._max = np.zeros(fields, np.int64)
+        self._last_max = np.zeros(fields, np.int64)
+        self._max_sum = np.zeros(fields, np.int64)
+        self._bid_sum = np.zeros(fields, np.int64)
+        self._win_count = np.zeros(fields, np.int64)
+        self._win_sum = np.zeros(fields, np.int64)
+        self._win_sq_sum = np.zeros(fields, np.float64)
+        self._spend_ewma = np.zeros(agents, np.float64)
+        self._alloc_ewma = np.zeros(agents + (num_fields,), np.float64)
+
+    def update(self, alloc_matrix, winners):
+        """
+        Folds in one round.
+        alloc_matrix: (..., num_agents, num_fields), winners: (..., num_fields)
+        with -1 where nobody won, as returned by resolve_fields.
+        """
+        alloc_matrix = np.asarray(alloc_matrix, np.int64)
+        winners = np.asarray(winners)
+
+        # 1. Bid levels
+        round_max = alloc_matrix.max(axis=-2)
+        np.maximum(self._max, round_max, out=self._max)
+        self._last_max[...] = round_max
+        self._max_sum += round_max
+        self._bid_sum += alloc_matrix.sum(axis=-2)
+
+        # 2. Winning bids
+        won = winners >= 0
+        bid = np.take_along_axis(alloc_matrix, np.maximum(winners, 0)[..., None, :], axis=-2)
+        bid = np.where(won, bid[..., 0, :], 0)
+        self._win_count += won
+        self._win_sum += bid
+        self._win_sq_sum += bid.astype(np.float64) ** 2
+
+        # 3. Spend EWMAs, seeded with the first round
+        alpha = 1.0 if self.rounds == 0 else self.alpha
+        self._spend_ewma += alpha * (alloc_matrix.sum(axis=-1) - self._spend_ewma)
+        self._alloc_ewma += alpha * (alloc_matrix - self._alloc_ewma)
+        self.rounds += 1
+
+    @classmethod
+    def from_history(cls, agent_names, field_values, history):
+        """Builds stats for a (rounds, agents, fields) history in one pass per round."""
+        from env import resolve_fields
+
+        history = np.asarray(history, np.int64)
+        stats = cls(agent_names, history.shape[-1])
+        winners, _ = resolve_fields(history, np.asarray(field_values, np.int64))
+        for alloc_matrix, round_winners in zip(history, winners):
+            stats.update(alloc_matrix, round_winners)
+        return stats
+
+    def game(self, idx):
+        """Live stats of one game of a batch: views of its arrays and the batch's round count."""
+        sub = _GameStats.__new__(_GameStats)
+        sub.__dict__.update(self.__dict__)
+        sub._batch = self
+        for attr, value in self.__dict__.items():
+            if isinstance(value, np.ndarray):
+                setattr(sub, attr, value[idx])
+        return sub
+
+    def snapshot(self):
+        """Copy of the stats as they are now; later rounds do not change it."""
+        copy = FieldStats.__new__(FieldStats)
+        copy.__dict__.update(self.__dict__)
+        copy.__dict__.pop("_batch", None)
+        copy.rounds = self.rounds
+        for attr, value in self.__dict__.items():
+            if isinstance(value, np.ndarray):
+                setattr(copy, attr, value.copy())
+        return copy
+
+    def spend(self, name):
+        """EWMA of the total spend per round of one agent."""
+        return _read_only(self._spend_ewma[..., self.agent_index[name]])
+
+    @property
+    def max(self):
+        return _read_only(self._max)
+
+    @property
+    def last_max(self):
+        return _read_only(self._last_max)
+
+    @property
+    def mean_max(self):
+        return _ratio(self._max_sum, self.rounds)
+
+    @property
+    def mean(self):
+        return _ratio(self._bid_sum, self.rounds * len(self.agent_names))
+
+    @property
+    def win_count(self):
+        return _read_only(self._win_count)
+
+    @property
+    def win_mean(self):
+        return _ratio(self._win_sum, self._win_count)
+
+    @property
+    def win_std(self):
+        mean = self.win_mean
+        var = _ratio(self._win_sq_sum, self._win_count) - mean**2
+        return np.sqrt(np.maximum(var, 0))
+
+    @property
+    def spend_ewma(self):
+        return _read_only(self._spend_ewma)
+
+    @property
+    def alloc_ewma(self):
+        return _read_only(self._alloc_ewma)
+
+
+class _GameStats(FieldStats):
+    """One game of a batched FieldStats (see FieldStats.game); updated through the batch."""
+
+    @property
+    def rounds(self):
+        return self._batch.rounds
@@ -3,7 +3,8 @@ import sys
 import importlib.util
 import numpy as np
 from agent_class import AbstractAgent
-from multiprocessing import Process
+from agent_pool import RemoteAgent
+from referee import MoveTimeout
 
 
 TIMEOUT = 30  # seconds to wait for output from a get_allocation function
@@ -96,6 +97,7 @@ def validate_output(
 
     print(f"[SUCCESS] Agent '{agent_instance.name}' passed all local checks!")
     print(f"Sample Output: {allocation}")
+    return True
 
 
 def validate_agent_submission(folder_path, class_name="Agent"):
@@ -131,8 +133,11 @@ def validate_agent_submission(folder_path, class_name="Agent"):
         return False
 
     # 5. Test Instantiation and get_allocation function
+    # The agent runs in one persistent worker process for all test cases
+    remote = None
     try:
         agent_instance = AgentClass(name=name)
+        remote = RemoteAgent(name, agent_file, timeout=TIMEOUT, max_restarts=0)
         for i in range(len(DUMMY_ROUNDS)):
             current_balance = DUMMY_BALANCES[i][DUMMY_NAME]
             history = DUMMY_HISTORIES[i]
@@ -144,37 +149,20 @@ def validate_agent_submission(folder_path, class_name="Agent"):
             )
 
             # 6. Validate output
-            p = Process(
-                target=validate_output,
-                args=(
-                    agent_instance,
+            try:
+                if not validate_output(
+                    remote,
                     current_balance,
                     history,
                     balances,
                     TOTAL_ROUNDS,
                     current_round,
-                ),
-            )
-            p.start()
-
-            # wait for MAX_T seconds only
-            p.join(timeout=TIMEOUT)
-            if p.is_alive():
-                p.terminate()  # Kill the process
-                p.join()
+                ):
+                    return False
+            except MoveTimeout:
                 raise FunctionTimeoutError(
                     "Function is taking too long to return a value!"
                 )
-                # print("Function timed out and was terminated.")
-
-            # validate_output(
-            #     agent_instance,
-            #     current_balance,
-            #     history,
-            #     balances,
-            #     TOTAL_ROUNDS,
-            #     current_round,
-            # )
         return True
 
     except FunctionTimeoutError as e:
@@ -188,6 +176,8 @@ def validate_agent_submission(folder_path, class_name="Agent"):
         traceback.print_exc()
         return False
     finally:
+        if remote is not None:
+            remote.close()
         # Clean up path
         if folder_path in sys.path:
             sys.path.remove(folder_path)
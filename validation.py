@@ -0,0 +1,71 @@
+import numpy as np
+
+# Violation codes returned per agent by validate_allocations
+VALID, WRONG_LENGTH, NON_INTEGER, NEGATIVE, OVER_BUDGET = range(5)
+VIOLATIONS = {
+    VALID: "valid",
+    WRONG_LENGTH: "wrong length",
+    NON_INTEGER: "non-integer",
+    NEGATIVE: "negative",
+    OVER_BUDGET: "over budget",
+}
+
+
+def _stack(proposals, n, codes):
+    """
+    Builds the (agents, n) float matrix. Well-formed input is converted in one
+    call; only if that fails are rows inspected one by one.
+    """
+    # Like validate_allocation, only lists and arrays count as moves (not tuples etc.)
+    well_typed = isinstance(proposals, np.ndarray) or all(
+        isinstance(p, (list, np.ndarray)) for p in proposals
+    )
+    try:
+        matrix = np.asarray(proposals)
+        if well_typed and matrix.shape == (len(codes), n) and matrix.dtype.kind in "biuf":
+            return matrix
+    except ValueError:
+        pass  # ragged rows
+
+    matrix = np.zeros((len(codes), n))
+    for i, p in enumerate(proposals):
+        if not isinstance(p, (list, np.ndarray)) or len(p) != n:
+            codes[i] = WRONG_LENGTH
+            continue
+        try:
+            row = np.asarray(p)
+        except ValueError:
+            codes[i] = WRONG_LENGTH
+            continue
+        if row.shape != (n,):
+            codes[i] = WRONG_LENGTH
+        elif row.dtype.kind not in "biuf":
+            # Strings, None and other non-numbers
+            codes[i] = NON_INTEGER
+        else:
+            matrix[i] = row
+    return matrix
+
+
+def validate_allocations(proposals, n, budgets):
+    """
+    Vectorized validate_allocation for a whole round.
+    proposals: (agents, n) matrix, or a list with one raw proposal per agent
+    budgets: balance of each agent
+
+    Returns the cleaned (agents, n) int64 matrix, with invalid rows replaced by
+    zeros exactly like validate_allocation, and a per-agent violation code.
+    """
+    budgets = np.asarray(budgets)
+    codes = np.zeros(len(budgets), dtype=np.int8)
+    matrix = _stack(proposals, n, codes)
+
+    with np.errstate(invalid="ignore"):
+        if matrix.dtype.kind == "f":
+            is_int = np.all(np.mod(matrix, 1) == 0, axis=1)
+            codes[(codes == VALID) & ~is_int] = NON_INTEGER
+        codes[(codes == VALID) & np.any(matrix < 0, axis=1)] = NEGATIVE
+        codes[(codes == VALID) & (matrix.sum(axis=1) > budgets)] = OVER_BUDGET
+
+    cleaned = np.where((codes == VALID)[:, None], matrix, 0).astype(np.int64)
+    return cleaned, codes